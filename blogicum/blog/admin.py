@@ -1,16 +1,125 @@
+from hashlib import sha1
+
 from django.contrib import admin
+from django.forms.models import BaseInlineFormSet
+from django.urls import reverse
+from django.utils.html import format_html
+from django.utils.http import urlencode
 
+from .admin_filters import (AuthorFilter, CachedRelatedFieldListFilter,
+                            LocationFilter)
+from .constants import ADMIN_COUNT_CACHE_TIMEOUT, POST_INLINE_LIMIT
 from .models import Category, Comment, Location, Post
+from .search import get_search_backend
+from .service import CachedCountPaginator
 
 admin.site.empty_value_display = 'Не задано'
 
 
+class CachedCountMixin:
+    """Число объектов в списке админки берётся из кэша.
+
+    Общее число объектов без фильтров не считается вовсе, а число
+    отфильтрованных кэшируется CachedCountPaginator по тексту запроса
+    на count_cache_timeout секунд. Поэтому после изменений счётчик
+    может недолго отставать.
+    """
+
+    show_full_result_count = False
+    count_cache_timeout = ADMIN_COUNT_CACHE_TIMEOUT
+
+    def get_paginator(
+            self,
+            request,
+            queryset,
+            per_page,
+            orphans=0,
+            allow_empty_first_page=True
+    ):
+        query = str(queryset.order_by().query).encode()
+        return CachedCountPaginator(
+            queryset,
+            per_page,
+            ('admin', self.opts.label_lower, sha1(query).hexdigest()),
+            self.count_cache_timeout,
+            orphans=orphans,
+            allow_empty_first_page=allow_empty_first_page,
+        )
+
+
+class IndexSearchMixin:
+    """Поиск в списке объектов по полнотекстовому индексу вместо LIKE.
+
+    search_index — метод бэкенда поиска, отбирающий объекты. Если
+    бэкенд не ведёт индекс, поиск идёт по search_fields.
+    """
+
+    search_index = None
+
+    def get_search_results(self, request, queryset, search_term):
+        backend = get_search_backend(queryset.db)
+        filtered = getattr(backend, self.search_index)(queryset, search_term)
+        if filtered is None:
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return filtered, False
+
+
+class SharedChoicesMixin:
+    """Общие варианты выбора для внешних ключей из list_editable.
+
+    Форма каждой строки списка копирует поле вместе с QuerySet и
+    загружает варианты заново, а админка строит поле дважды: для формы
+    списка и для набора форм. Здесь варианты загружаются один раз
+    за запрос и хранятся в request.
+    """
+
+    share_list_editable_choices = True
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(
+            db_field, request, **kwargs
+        )
+        if (
+            self.share_list_editable_choices
+            and formfield is not None
+            and db_field.name in self.list_editable
+        ):
+            shared = request.__dict__.setdefault('_shared_choices', {})
+            key = (db_field.model._meta.label_lower, db_field.name)
+            if key not in shared:
+                # iter(): list() вызвал бы ещё и len() с COUNT(*).
+                shared[key] = list(iter(formfield.choices))
+            formfield.choices = shared[key]
+        return formfield
+
+
+class CappedInlineFormSet(BaseInlineFormSet):
+    """Набор форм только для первых max_rows объектов выборки."""
+
+    max_rows = POST_INLINE_LIMIT
+
+    def get_queryset(self):
+        if not hasattr(self, '_capped_queryset'):
+            self._capped_queryset = super().get_queryset()[:self.max_rows]
+        return self._capped_queryset
+
+
 class PostInLine(admin.TabularInline):
+    """Последние записи категории или местоположения, только просмотр.
+
+    Выводится не больше POST_INLINE_LIMIT записей и только показанные
+    столбцы; полный список открывается по ссылке posts_link.
+    """
+
     model = Post
+    formset = CappedInlineFormSet
     extra = 0
-    readonly_fields = (
+    ordering = ('-pub_date', '-id')
+    fields = (
         'title',
-        'text',
+        'excerpt',
         'pub_date',
         'author',
         'location',
@@ -18,13 +127,61 @@ class PostInLine(admin.TabularInline):
         'is_published',
         'created_at',
     )
+    readonly_fields = fields
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related(
+            'author',
+            'location',
+            'category',
+        ).only(
+            'id',
+            'title',
+            'excerpt',
+            'pub_date',
+            'is_published',
+            'created_at',
+            'author__username',
+            'location__name',
+            'category__title',
+        )
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+class PostListLinkMixin:
+    """Ссылка на список записей, отфильтрованный по объекту.
+
+    post_filter — поле Post, по которому фильтруется список.
+    """
+
+    post_filter = None
+
+    @admin.display(description='Все записи')
+    def posts_link(self, obj):
+        if obj is None or obj.pk is None:
+            return admin.site.empty_value_display
+        url = '{}?{}'.format(
+            reverse('admin:blog_post_changelist'),
+            urlencode({f'{self.post_filter}__id__exact': obj.pk})
+        )
+        return format_html('<a href="{}">Открыть список записей</a>', url)
 
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(PostListLinkMixin, admin.ModelAdmin):
     inlines = (
         PostInLine,
     )
+    post_filter = 'category'
+    readonly_fields = ('posts_link',)
     list_display = (
         'title',
         'description',
@@ -45,10 +202,12 @@ class CategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Location)
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(PostListLinkMixin, admin.ModelAdmin):
     inlines = (
         PostInLine,
     )
+    post_filter = 'location'
+    readonly_fields = ('posts_link',)
     list_display = (
         'name',
         'is_published',
@@ -62,7 +221,12 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(
+    CachedCountMixin,
+    IndexSearchMixin,
+    SharedChoicesMixin,
+    admin.ModelAdmin
+):
     list_display = (
         'title',
         'text',
@@ -83,6 +247,7 @@ class PostAdmin(admin.ModelAdmin):
         'title',
         'text',
     )
+    search_index = 'filter_posts'
     list_display_links = ('title',)
     list_select_related = (
         'author',
@@ -90,15 +255,15 @@ class PostAdmin(admin.ModelAdmin):
         'location',
     )
     list_filter = (
-        'author',
-        'location',
-        'category',
+        AuthorFilter,
+        LocationFilter,
+        ('category', CachedRelatedFieldListFilter),
         'is_published'
     )
 
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(CachedCountMixin, IndexSearchMixin, admin.ModelAdmin):
     list_display = (
         'text',
         'post',
@@ -109,12 +274,13 @@ class CommentAdmin(admin.ModelAdmin):
     search_fields = (
         'text',
     )
+    search_index = 'filter_comments'
     list_display_links = ('text',)
     list_select_related = (
         'author',
         'post',
     )
     list_filter = (
-        'author',
+        AuthorFilter,
         'is_published'
     )
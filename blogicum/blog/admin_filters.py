@@ -0,0 +1,125 @@
+"""Фильтры списков объектов в админке приложения blog.
+
+Стандартный фильтр по внешнему ключу выводит все связанные объекты.
+Для авторов и местоположений, которых может быть сотни тысяч, вместо
+списка выводится поле ввода, а небольшой список категорий кэшируется.
+"""
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.utils.functional import cached_property
+
+from .constants import ADMIN_CHOICES_CACHE_TIMEOUT
+
+
+def admin_choices_key(model) -> str:
+    """Ключ кэша вариантов фильтра по модели model."""
+    return f'blog:admin_choices:{model._meta.label_lower}'
+
+
+def invalidate_admin_choices(model):
+    """Сбрасывает закэшированные варианты фильтра по модели model."""
+    cache.delete(admin_choices_key(model))
+
+
+class InputFilter(admin.SimpleListFilter):
+    """Фильтр с полем ввода вместо списка вариантов.
+
+    Значение из поля подставляется в lookup; список связанных объектов
+    не загружается. Фильтр принимает и точный выбор объекта параметром
+    <field_name>__id__exact — так на список ссылаются страницы связанных
+    объектов, см. PostListLinkMixin.
+    """
+
+    template = 'admin/input_filter.html'
+    field_name = None
+    lookup = None
+    placeholder = ''
+
+    def __init__(self, request, params, model, model_admin):
+        self.related_parameter = f'{self.field_name}__id__exact'
+        super().__init__(request, params, model, model_admin)
+        self.related_model = model._meta.get_field(
+            self.field_name
+        ).related_model
+        if self.related_parameter in params:
+            self.used_parameters[self.related_parameter] = params.pop(
+                self.related_parameter
+            )
+
+    def expected_parameters(self):
+        return [self.parameter_name, self.related_parameter]
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    @cached_property
+    def related_object(self):
+        """Объект, выбранный параметром related_parameter, или None."""
+        pk = self.used_parameters.get(self.related_parameter)
+        if pk is None:
+            return None
+        return self.related_model._default_manager.filter(pk=pk).first()
+
+    def queryset(self, request, queryset):
+        filters = {}
+        value = (self.value() or '').strip()
+        if value:
+            filters[self.lookup] = value
+        if self.related_parameter in self.used_parameters:
+            filters[self.related_parameter] = self.used_parameters[
+                self.related_parameter
+            ]
+        try:
+            return queryset.filter(**filters)
+        except (ValidationError, ValueError) as error:
+            raise IncorrectLookupParameters(error)
+
+    def choices(self, changelist):
+        parameters = self.expected_parameters()
+        yield {
+            'selected': not self.used_parameters,
+            'query_string': changelist.get_query_string(remove=parameters),
+            'query_parts': [
+                (name, value) for name, value in changelist.params.items()
+                if name not in (*parameters, PAGE_VAR)
+            ],
+            'display': 'Сбросить',
+        }
+
+
+class AuthorFilter(InputFilter):
+    title = 'автору'
+    parameter_name = 'author'
+    field_name = 'author'
+    lookup = 'author__username'
+    placeholder = 'Имя пользователя'
+
+
+class LocationFilter(InputFilter):
+    title = 'местоположению'
+    parameter_name = 'location'
+    field_name = 'location'
+    lookup = 'location__name__istartswith'
+    placeholder = 'Начало названия'
+
+
+class CachedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """Фильтр по внешнему ключу на модель с немногими объектами.
+
+    Варианты кэшируются на ADMIN_CHOICES_CACHE_TIMEOUT секунд и
+    сбрасываются обработчиками сигналов при изменении объектов.
+    """
+
+    def field_choices(self, field, request, model_admin):
+        key = admin_choices_key(field.related_model)
+        choices = cache.get(key)
+        if choices is None:
+            choices = super().field_choices(field, request, model_admin)
+            cache.set(key, choices, ADMIN_CHOICES_CACHE_TIMEOUT)
+        return choices
@@ -0,0 +1,65 @@
+"""Асинхронные варианты представлений чтения приложения blog.
+
+В Django 3.2 нет асинхронного ORM, поэтому запросы к базе и отрисовка
+шаблона выполняются в потоке одним вызовом sync_to_async. Кэш страниц
+тоже читается в потоке: файловый кэш обращается к диску, а цикл
+событий не должен ждать ввода-вывода.
+
+Подключаются вместо blog.views настройкой BLOG_ASYNC_VIEWS при запуске
+проекта через ASGI.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import views
+from .caching import get_cached_page, page_cache_key, store_page
+
+
+async def _is_anonymous(request) -> bool:
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        # Без cookie сессии пользователь не загружается из базы.
+        return True
+    return await sync_to_async(lambda: request.user.is_anonymous)()
+
+
+def async_cache_anonymous_page(view):
+    """Асинхронный вариант caching.cache_anonymous_page.
+
+    Параметры:
+        view: синхронное представление без декоратора кэша
+    """
+    sync_view = sync_to_async(view)
+
+    @sync_to_async
+    def render_and_store(request, key, *args, **kwargs):
+        request.page_dependencies = set()
+        response = view(request, *args, **kwargs)
+        store_page(request, key, response)
+        return response
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or not await _is_anonymous(request)
+        ):
+            return await sync_view(request, *args, **kwargs)
+        key = page_cache_key(request)
+        response = await sync_to_async(get_cached_page)(request, key)
+        if response is not None:
+            return response
+        return await render_and_store(request, key, *args, **kwargs)
+
+    return wrapper
+
+
+index = async_cache_anonymous_page(views.index.__wrapped__)
+post_detail = async_cache_anonymous_page(views.post_detail.__wrapped__)
+category_posts = async_cache_anonymous_page(views.category_posts.__wrapped__)
+
+
+async def user_profile(request, username):
+    """Асинхронный вариант views.user_profile."""
+    return await sync_to_async(views.user_profile)(request, username)
@@ -0,0 +1,162 @@
+"""Кэш целых страниц блога для анонимных посетителей.
+
+Каждая сохранённая страница помнит версии своих зависимостей:
+'feed', 'post:<id>', 'category:<id>', 'location:<id>', 'user:<id>'.
+Сигналы моделей меняют версии затронутых зависимостей, и страница,
+собранная из устаревших данных, перестаёт считаться действительной.
+"""
+from functools import wraps
+from hashlib import md5
+from typing import Dict, Iterable, Optional
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import (get_conditional_response, get_max_age,
+                                patch_response_headers, patch_vary_headers)
+from django.utils.http import parse_http_date_safe
+from django.utils.timezone import now
+
+from .constants import PAGE_CACHE_TIMEOUT
+from .models import Post
+
+
+def _version_key(dependency: str) -> str:
+    return f'blog:page_dependency:{dependency}'
+
+
+def get_dependency_versions(dependencies: Iterable[str]) -> Dict[str, str]:
+    """Возвращает текущие версии зависимостей, создавая недостающие."""
+    keys = {_version_key(name): name for name in dependencies}
+    versions = cache.get_many(keys)
+    missing = {key: uuid4().hex for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def invalidate_pages(*dependencies: str):
+    """Делает недействительными страницы, зависящие от dependencies."""
+    cache.set_many(
+        {_version_key(name): uuid4().hex for name in dependencies}, None
+    )
+
+
+def add_page_dependencies(request, *dependencies: str):
+    """Регистрирует зависимости страницы, которую строит представление."""
+    if hasattr(request, 'page_dependencies'):
+        request.page_dependencies.update(dependencies)
+
+
+def post_dependencies(post: Post):
+    """Возвращает зависимости фрагмента страницы с записью post."""
+    dependencies = [f'post:{post.pk}', f'user:{post.author_id}']
+    if post.category_id:
+        dependencies.append(f'category:{post.category_id}')
+    if post.location_id:
+        dependencies.append(f'location:{post.location_id}')
+    return dependencies
+
+
+def add_posts_dependencies(request, posts: Iterable[Post]):
+    """Регистрирует зависимости всех записей, выведенных на странице."""
+    for post in posts:
+        add_page_dependencies(request, *post_dependencies(post))
+
+
+def page_cache_key(request) -> str:
+    """Возвращает ключ кэша страницы по полному адресу запроса."""
+    return 'blog:page:{}'.format(
+        md5(request.build_absolute_uri().encode()).hexdigest()
+    )
+
+
+def get_cached_page(request, key: str) -> Optional[HttpResponse]:
+    """Возвращает сохранённый ответ, если его зависимости не менялись.
+
+    Ответ всегда получает Vary: Cookie: без cookie сессии
+    SessionMiddleware этот заголовок не добавит, и браузер или прокси
+    отдавали бы анонимную страницу и после входа на сайт.
+    """
+    entry = cache.get(key)
+    if (
+        entry is None
+        or get_dependency_versions(entry['versions']) != entry['versions']
+    ):
+        return None
+    response = HttpResponse(
+        entry['content'], content_type=entry['content_type']
+    )
+    for header, value in entry['validators'].items():
+        response[header] = value
+    patch_vary_headers(response, ('Cookie',))
+    if entry['expires'] is not None:
+        patch_response_headers(
+            response,
+            max(0, int(entry['expires'] - now().timestamp()))
+        )
+    return get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=parse_http_date_safe(response.get('Last-Modified')),
+        response=response
+    )
+
+
+def store_page(request, key: str, response: HttpResponse):
+    """Сохраняет ответ в кэш, если его можно отдавать всем анонимам."""
+    if (
+        response.status_code != 200
+        or response.streaming
+        or response.cookies
+        or request.META.get('CSRF_COOKIE_USED')
+        or not request.page_dependencies
+    ):
+        return
+    max_age = get_max_age(response)
+    timeout = PAGE_CACHE_TIMEOUT if max_age is None else max_age
+    if not timeout:
+        return
+    cache.set(key, {
+        'content': response.content,
+        'content_type': response['Content-Type'],
+        'validators': {
+            header: response[header]
+            for header in ('ETag', 'Last-Modified')
+            if response.has_header(header)
+        },
+        'expires': (
+            None if max_age is None else now().timestamp() + max_age
+        ),
+        'versions': get_dependency_versions(request.page_dependencies),
+    }, timeout)
+
+
+def cache_anonymous_page(view):
+    """Кэширует ответы представления для анонимных посетителей.
+
+    Ответы авторизованным пользователям, ответы с CSRF-токеном или
+    cookie и ответы с кодом, отличным от 200, не кэшируются. Время
+    жизни берётся из Cache-Control: max-age ответа, который выставляет
+    представление (например, до ближайшей отложенной публикации),
+    а без него равно PAGE_CACHE_TIMEOUT.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or request.user.is_authenticated
+        ):
+            return view(request, *args, **kwargs)
+        key = page_cache_key(request)
+        response = get_cached_page(request, key)
+        if response is not None:
+            return response
+        request.page_dependencies = set()
+        response = view(request, *args, **kwargs)
+        store_page(request, key, response)
+        return response
+
+    return wrapper
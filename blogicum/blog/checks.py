@@ -0,0 +1,27 @@
+"""Системные проверки настроек приложения blog."""
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Предупреждает, если кэш по умолчанию виден только одному процессу.
+
+    Сигналы и задачи run_worker сбрасывают кэш страниц, версии их
+    зависимостей и счётчики записей; в LocMemCache сброс не доходит
+    до других процессов, и они отдают устаревшие страницы.
+    """
+    if not isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+        return []
+    return [
+        Warning(
+            'Кэш по умолчанию хранится в памяти процесса: сброс кэша '
+            'страниц не дойдёт до других веб-процессов и run_worker.',
+            hint=(
+                'Укажите в CACHES общий кэш: FileBasedCache для одного '
+                'сервера, Redis или Memcached для нескольких.'
+            ),
+            id='blog.W001',
+        )
+    ]
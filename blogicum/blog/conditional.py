@@ -0,0 +1,65 @@
+"""Условные GET-запросы (ETag и Last-Modified) для страниц блога.
+
+Валидаторы считаются по уже выбранным из базы данным страницы, поэтому
+ответ 304 Not Modified отдаётся без отрисовки шаблонов.
+"""
+from datetime import datetime
+from hashlib import md5
+from typing import Any, Optional
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def page_state(page_obj) -> tuple:
+    """Описание страницы ленты для ETag: записи, их версии и навигация."""
+    state = [
+        (post.pk, post.updated_at, post.comment_count) for post in page_obj
+    ]
+    if getattr(page_obj, 'is_keyset', False):
+        return (state, page_obj.next_cursor, page_obj.previous_cursor)
+    return (state, page_obj.number, page_obj.paginator.count)
+
+
+class PageValidators:
+    """ETag и Last-Modified страницы, построенной для request.
+
+    ETag учитывает пользователя: шапка и кнопки на странице зависят
+    от того, кто её смотрит.
+
+    Параметры:
+        state: любые данные, от которых зависит содержимое страницы
+        last_modified (datetime): время последнего изменения данных;
+            не указывается, если страница зависит от данных без отметок
+            времени
+    """
+
+    def __init__(
+            self,
+            request,
+            *state: Any,
+            last_modified: Optional[datetime] = None
+    ):
+        self.request = request
+        viewer = (request.user.pk, request.user.get_username())
+        self.etag = quote_etag(
+            md5(repr((viewer, state)).encode()).hexdigest()
+        )
+        self.last_modified = (
+            int(last_modified.timestamp()) if last_modified else None
+        )
+
+    def not_modified(self):
+        """Возвращает ответ 304 (или 412), если копия клиента актуальна."""
+        return get_conditional_response(
+            self.request,
+            etag=self.etag,
+            last_modified=self.last_modified
+        )
+
+    def patch(self, response):
+        """Добавляет валидаторы в заголовки ответа."""
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.last_modified)
+        return response
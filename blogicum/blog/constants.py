@@ -2,4 +2,58 @@
 
 
 NUM_OF_POSTS_PER_PAGE = 10
+NUM_OF_COMMENTS_PER_PAGE = 50
 NAME_DISPLAY_LENGTH = 60
+
+# Сколько слов текста записи хранить в Post.excerpt для карточек лент.
+EXCERPT_WORDS = 10
+
+# Время жизни закэшированного числа записей ленты, в секундах.
+POST_COUNT_CACHE_TIMEOUT = 60
+
+# Сколько номеров страниц показывать вокруг текущей и на краях.
+PAGINATOR_ON_EACH_SIDE = 2
+PAGINATOR_ON_ENDS = 1
+
+# Время жизни страниц в кэше для анонимных посетителей, в секундах.
+PAGE_CACHE_TIMEOUT = 300
+
+# Время жизни отрисованной карточки записи в кэше, в секундах.
+POST_CARD_CACHE_TIMEOUT = 3600
+
+# Сколько хранить сведения об отсутствии отложенных публикаций, в секундах.
+NEXT_PUBLICATION_CACHE_TIMEOUT = 3600
+
+# Размеры копий изображений записей: наибольшая сторона в пикселях.
+# Карточка шириной 40rem, копия detail — для экранов высокой плотности.
+THUMBNAIL_SIZES = {
+    'card': 640,
+    'detail': 1280,
+}
+THUMBNAIL_DIR = 'thumbnails'
+THUMBNAIL_QUALITY = 82
+# Качество JPEG при пересохранении оригинала без EXIF: почти без потерь.
+ORIGINAL_JPEG_QUALITY = 95
+# Сколько хранить в кэше сведения о готовых копиях, в секундах.
+THUMBNAIL_CACHE_TIMEOUT = 24 * 60 * 60
+# Сколько помнить, что копий ещё нет: до обработки изображения шаблоны
+# не открывают отсутствующий манифест при каждой отрисовке.
+THUMBNAIL_MISSING_CACHE_TIMEOUT = 60
+
+# Поиск: сколько слов запроса учитывать, длина фрагмента в словах
+# и веса BM25 для заголовка и текста записи и для комментариев.
+SEARCH_MAX_TERMS = 8
+SEARCH_SNIPPET_WORDS = 24
+SEARCH_WEIGHTS = (10.0, 4.0, 1.0)
+
+# Сколько последних записей выводить на странице категории
+# и местоположения в админке; остальные — по ссылке на список записей.
+POST_INLINE_LIMIT = 20
+
+# Сколько хранить в кэше варианты фильтров админки по категориям,
+# в секундах; изменение категории сбрасывает их сразу.
+ADMIN_CHOICES_CACHE_TIMEOUT = 60 * 60
+
+# Время жизни числа объектов в списках админки, в секундах. Изменение
+# записей и категорий сбрасывает его сразу, комментариев — нет.
+ADMIN_COUNT_CACHE_TIMEOUT = 60
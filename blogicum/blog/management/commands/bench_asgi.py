@@ -0,0 +1,202 @@
+"""Сравнение пропускной способности страниц блога под WSGI и ASGI."""
+import asyncio
+import json
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from statistics import quantiles
+from time import perf_counter
+from wsgiref.util import setup_testing_defaults
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Post
+
+HOST = '127.0.0.1'
+
+
+def _default_paths():
+    post = (
+        Post.objects.filter(is_published=True, category__is_published=True)
+        .select_related('author', 'category')
+        .order_by('-pub_date')
+        .first()
+    )
+    if post is None:
+        raise CommandError('В базе нет опубликованных записей.')
+    return [
+        '/',
+        f'/posts/{post.pk}/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+    ]
+
+
+def _run_wsgi(paths, requests, concurrency):
+    from django.core.handlers.wsgi import WSGIHandler
+
+    handler = WSGIHandler()
+
+    def call(path):
+        environ = {}
+        setup_testing_defaults(environ)
+        environ.update(PATH_INFO=path, HTTP_HOST=HOST, SERVER_NAME=HOST)
+        statuses = []
+        started = perf_counter()
+        response = handler(
+            environ, lambda status, headers: statuses.append(status)
+        )
+        b''.join(response)
+        response.close()
+        return perf_counter() - started, statuses[0].startswith('200')
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        return list(executor.map(
+            call, (paths[i % len(paths)] for i in range(requests))
+        ))
+
+
+def _run_asgi(paths, requests, concurrency):
+    from django.core.handlers.asgi import ASGIHandler
+
+    handler = ASGIHandler()
+
+    async def call(path):
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': b'',
+            'headers': [(b'host', HOST.encode())],
+            'client': (HOST, 0),
+            'server': (HOST, 80),
+        }
+        status = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                status.append(message['status'])
+
+        started = perf_counter()
+        await handler(scope, receive, send)
+        return perf_counter() - started, status[0] == 200
+
+    async def worker(queue, results):
+        while queue:
+            results.append(await call(queue.pop()))
+
+    async def main():
+        queue = [paths[i % len(paths)] for i in range(requests)]
+        results = []
+        await asyncio.gather(
+            *(worker(queue, results) for _ in range(concurrency))
+        )
+        return results
+
+    return asyncio.run(main())
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет одинаковую нагрузку на страницы чтения через WSGI '
+        '(синхронные представления, пул потоков) и через ASGI '
+        '(blog.async_views) и выводит пропускную способность и задержки. '
+        'Каждый режим запускается в отдельном процессе на текущей базе.'
+    )
+    # Адреса загружаются после выбора представлений в дочернем процессе.
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='Сколько запросов отправить в каждом режиме.',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=16,
+            help='Число одновременных запросов.',
+        )
+        parser.add_argument(
+            '--path',
+            action='append',
+            dest='paths',
+            help='Адрес страницы; по умолчанию лента, запись, категория '
+                 'и профиль последней записи.',
+        )
+        parser.add_argument(
+            '--no-page-cache',
+            action='store_true',
+            help='Отключить кэш страниц, чтобы каждый запрос шёл в базу.',
+        )
+        parser.add_argument(
+            '--server',
+            choices=('wsgi', 'asgi'),
+            help='Внутренний параметр: замер одного режима.',
+        )
+
+    def handle(self, *args, **options):
+        if options['server']:
+            self._measure(options)
+            return
+        paths = options['paths'] or _default_paths()
+        self.stdout.write(
+            f'{"режим":>6} {"зап/с":>9} {"p50 мс":>8} {"p95 мс":>8} '
+            f'{"p99 мс":>8} {"ошибок":>7}'
+        )
+        for server in ('wsgi', 'asgi'):
+            command = [
+                sys.executable, str(settings.BASE_DIR / 'manage.py'),
+                'bench_asgi', '--server', server,
+                '--requests', str(options['requests']),
+                '--concurrency', str(options['concurrency']),
+                *(f'--path={path}' for path in paths),
+            ]
+            if options['no_page_cache']:
+                command.append('--no-page-cache')
+            output = subprocess.run(
+                command, check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output.splitlines()[-1])
+            self.stdout.write(
+                f'{server:>6} {result["rps"]:>9.1f} {result["p50"]:>8.2f} '
+                f'{result["p95"]:>8.2f} {result["p99"]:>8.2f} '
+                f'{result["errors"]:>7}'
+            )
+
+    def _measure(self, options):
+        # Панель отладки работает только синхронно и заняла бы поток
+        # под каждый ASGI-запрос, поэтому в замере она отключена.
+        settings.MIDDLEWARE = [
+            middleware for middleware in settings.MIDDLEWARE
+            if not middleware.startswith('debug_toolbar.')
+        ]
+        settings.BLOG_ASYNC_VIEWS = options['server'] == 'asgi'
+        if options['no_page_cache']:
+            settings.CACHES = {'default': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+            }}
+        run = _run_asgi if options['server'] == 'asgi' else _run_wsgi
+        paths = options['paths'] or _default_paths()
+        started = perf_counter()
+        results = run(paths, options['requests'], options['concurrency'])
+        elapsed = perf_counter() - started
+        latencies = [latency * 1000 for latency, _ in results]
+        cuts = quantiles(latencies, n=100)
+        self.stdout.write(json.dumps({
+            'rps': len(results) / elapsed,
+            'p50': cuts[49],
+            'p95': cuts[94],
+            'p99': cuts[98],
+            'errors': sum(not ok for _, ok in results),
+        }))
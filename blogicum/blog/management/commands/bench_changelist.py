@@ -0,0 +1,112 @@
+"""Замер отрисовки списка записей в админке."""
+from statistics import median
+from time import perf_counter
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.models import Category, Location, Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу записями во временной транзакции и замеряет '
+        'отрисовку /admin/blog/post/ с общими вариантами внешних ключей '
+        'из list_editable и без них. Данные после замера откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=100,
+            help='Сколько записей на странице списка.',
+        )
+        parser.add_argument(
+            '--locations',
+            type=int,
+            default=200,
+            help='Сколько местоположений создать.',
+        )
+        parser.add_argument(
+            '--categories',
+            type=int,
+            default=20,
+            help='Сколько категорий создать.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=10,
+            help='Сколько раз отрисовывать страницу в каждом режиме.',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            request = self._seed(options)
+            self.stdout.write(f'{"режим":>10} {"запросов":>9} {"мс":>8}')
+            for shared in (False, True):
+                queries, elapsed = self._measure(
+                    request, shared, options['rows'], options['repeat']
+                )
+                mode = 'общие' if shared else 'по строкам'
+                self.stdout.write(f'{mode:>10} {queries:>9} {elapsed:>8.1f}')
+            transaction.set_rollback(True)
+
+    def _seed(self, options):
+        user = get_user_model().objects.create_superuser(
+            'bench_changelist', 'bench@example.com', 'bench'
+        )
+        # bulk_create() в SQLite не возвращает первичные ключи,
+        # поэтому созданные объекты выбираются заново.
+        Category.objects.bulk_create(
+            Category(title=f'Категория {i}', slug=f'bench-changelist-{i}')
+            for i in range(options['categories'])
+        )
+        Location.objects.bulk_create(
+            Location(name=f'bench-changelist {i}')
+            for i in range(options['locations'])
+        )
+        categories = list(
+            Category.objects.filter(slug__startswith='bench-changelist-')
+        )
+        locations = list(
+            Location.objects.filter(name__startswith='bench-changelist ')
+        )
+        now = timezone.now()
+        Post.objects.bulk_create(
+            Post(
+                title=f'Запись {i}',
+                text='Текст',
+                pub_date=now,
+                author=user,
+                category=categories[i % len(categories)],
+                location=locations[i % len(locations)],
+            )
+            for i in range(options['rows'])
+        )
+        request = RequestFactory().get('/admin/blog/post/')
+        request.user = user
+        return request
+
+    def _measure(self, request, shared, rows, repeat):
+        model_admin = admin.site._registry[Post]
+        model_admin.list_per_page = rows
+        model_admin.share_list_editable_choices = shared
+        timings = []
+        try:
+            for _ in range(repeat):
+                request.__dict__.pop('_shared_choices', None)
+                with CaptureQueriesContext(connection) as queries:
+                    started = perf_counter()
+                    model_admin.changelist_view(request).render()
+                    timings.append((perf_counter() - started) * 1000)
+        finally:
+            del model_admin.list_per_page
+            del model_admin.share_list_editable_choices
+        return len(queries), median(timings)
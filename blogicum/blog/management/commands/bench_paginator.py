@@ -0,0 +1,50 @@
+"""Замер времени отрисовки и размера навигации по страницам."""
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.template.loader import get_template
+
+from blog.constants import NUM_OF_POSTS_PER_PAGE
+from blog.service import get_elided_page_range
+
+
+class Command(BaseCommand):
+    help = (
+        'Отрисовывает includes/paginator.html для лент разного размера '
+        'и выводит размер HTML и время отрисовки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages',
+            type=int,
+            nargs='+',
+            default=[10, 100, 1000, 20000, 200000],
+            help='Число страниц в ленте.',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=50,
+            help='Сколько раз отрисовывать шаблон для каждого размера.',
+        )
+
+    def handle(self, *args, **options):
+        template = get_template('includes/paginator.html')
+        self.stdout.write(f'{"страниц":>10} {"байт":>8} {"мс":>8}')
+        for num_pages in options['pages']:
+            paginator = Paginator(
+                range(num_pages * NUM_OF_POSTS_PER_PAGE),
+                NUM_OF_POSTS_PER_PAGE
+            )
+            page_obj = paginator.get_page(num_pages // 2)
+            page_obj.elided_page_range = get_elided_page_range(page_obj)
+            context = {'page_obj': page_obj}
+            started = perf_counter()
+            for _ in range(options['repeat']):
+                html = template.render(context)
+            elapsed = (perf_counter() - started) / options['repeat'] * 1000
+            self.stdout.write(
+                f'{num_pages:>10} {len(html.encode()):>8} {elapsed:>8.3f}'
+            )
@@ -0,0 +1,65 @@
+"""Команда постановки в очередь обработки изображений записей блога."""
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.thumbnails import get_renditions
+from core.jobs import enqueue
+
+
+class Command(BaseCommand):
+    help = (
+        'Ставит в очередь задачу blog.process_post_image для записей '
+        'с изображениями без готовых копий. Запускается для записей, '
+        'загруженных до появления копий, и после изменения THUMBNAIL_SIZES '
+        '(с --all).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько записей читать за один запрос.',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Создать заново копии всех изображений.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать изображения без копий.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = (
+            Post.objects.exclude(image='').only('id', 'image').order_by('pk')
+        )
+        last_pk = 0
+        queued = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for post in batch:
+                if not options['all'] and get_renditions(
+                        post.image, generate=False
+                ):
+                    continue
+                if not options['dry_run']:
+                    enqueue(
+                        'blog.process_post_image',
+                        post_id=post.pk,
+                        name=post.image.name,
+                        force=options['all']
+                    )
+                queued += 1
+        if options['dry_run']:
+            self.stdout.write(f'Изображений без копий: {queued}')
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f'Поставлено в очередь изображений: {queued}')
+        )
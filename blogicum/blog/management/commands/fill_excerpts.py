@@ -0,0 +1,54 @@
+"""Команда заполнения кратких текстов записей блога."""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет Post.excerpt по тексту записей. Миграция 0012 '
+        'заполняет поле сама; команда запускается после изменения '
+        'EXCERPT_WORDS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Сколько записей читать и обновлять за один запрос.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать записи с устаревшим кратким текстом.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        posts = Post.objects.only('id', 'text', 'excerpt').order_by('pk')
+        last_pk = 0
+        fixed = 0
+        while True:
+            batch = list(posts.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            changed = []
+            for post in batch:
+                excerpt = Post.make_excerpt(post.text)
+                if post.excerpt != excerpt:
+                    post.excerpt = excerpt
+                    # updated_at входит в ключ кэша карточки записи.
+                    post.updated_at = timezone.now()
+                    changed.append(post)
+            if changed and not options['dry_run']:
+                Post.objects.bulk_update(changed, ('excerpt', 'updated_at'))
+            fixed += len(changed)
+        if options['dry_run']:
+            self.stdout.write(f'Устаревших кратких текстов: {fixed}')
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f'Обновлено кратких текстов: {fixed}')
+        )
@@ -0,0 +1,38 @@
+"""Команда перестроения поискового индекса записей блога."""
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from blog.search import get_search_backend
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит поисковые индексы записей и комментариев заново. Нужна '
+        'после массовых изменений, минующих save(), например '
+        'Post.objects.update(text=...), и после миграций, пересоздающих '
+        'таблицу комментариев: вместе с ней SQLite удаляет триггеры '
+        'индекса комментариев.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='База данных, индекс которой перестраивается.',
+        )
+        parser.add_argument(
+            '--optimize',
+            action='store_true',
+            help='Не перестраивать индекс, а только сжать его.',
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(options['database'])
+        if options['optimize']:
+            backend.optimize()
+            self.stdout.write(self.style.SUCCESS('Индекс сжат.'))
+            return
+        indexed = backend.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(f'Проиндексировано записей: {indexed}')
+        )
@@ -0,0 +1,36 @@
+"""Команда пересчёта счётчиков комментариев у записей блога."""
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает Post.comment_count по комментариям записей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать записи с неверным счётчиком.',
+        )
+
+    def handle(self, *args, **options):
+        broken = (
+            Post.objects.annotate(
+                actual_count=Post.objects.actual_comment_count()
+            )
+            .exclude(comment_count=F('actual_count'))
+        )
+        if options['dry_run']:
+            for post_id, stored, actual in broken.values_list(
+                    'id', 'comment_count', 'actual_count'
+            ):
+                self.stdout.write(f'post {post_id}: {stored} -> {actual}')
+            return
+        fixed = Post.objects.filter(
+            pk__in=list(broken.values_list('pk', flat=True))
+        ).update_comment_count()
+        self.stdout.write(
+            self.style.SUCCESS(f'Исправлено счётчиков: {fixed}')
+        )
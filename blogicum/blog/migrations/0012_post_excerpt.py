@@ -0,0 +1,41 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:49
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+# EXCERPT_WORDS на момент миграции; после его изменения краткие тексты
+# пересчитывает команда fill_excerpts.
+EXCERPT_WORDS = 10
+BATCH_SIZE = 500
+
+
+def fill_excerpts(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    posts = Post.objects.only('id', 'text').order_by('pk')
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        for post in batch:
+            post.excerpt = Truncator(post.text).words(
+                EXCERPT_WORDS, truncate=' …'
+            )
+        Post.objects.bulk_update(batch, ('excerpt',))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Краткий текст'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
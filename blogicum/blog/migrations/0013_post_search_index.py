@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Поисковый индекс FTS5: строка таблицы — запись блога (rowid = Post.id)
+# с заголовком и текстом. Комментарии индексируются отдельно
+# (миграция 0014), поэтому их изменение не переписывает строку записи.
+CREATE_INDEX = """
+CREATE VIRTUAL TABLE IF NOT EXISTS blog_post_search USING fts5(
+    title, text,
+    tokenize = 'unicode61 remove_diacritics 2',
+    prefix = '2 3'
+)
+"""
+FILL_INDEX = """
+INSERT INTO blog_post_search (rowid, title, text)
+SELECT id, title, text FROM blog_post
+"""
+DROP_INDEX = 'DROP TABLE IF EXISTS blog_post_search'
+
+
+def create_search_index(apps, schema_editor):
+    # Для других СУБД поиск работает без индекса, см. blog.search.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_INDEX)
+    schema_editor.execute(FILL_INDEX)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(DROP_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,72 @@
+from django.db import migrations
+
+# Индекс FTS5 комментариев для поиска в админке: внешнее содержимое
+# (content=blog_comment), поэтому тексты не хранятся второй раз.
+# Индекс ведут триггеры — они срабатывают и при bulk_create(), update()
+# и каскадном удалении, которые не вызывают сигналы моделей.
+CREATE_INDEX = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS blog_comment_search USING fts5(
+        text,
+        content = 'blog_comment',
+        content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_comment_search_insert
+    AFTER INSERT ON blog_comment BEGIN
+        INSERT INTO blog_comment_search (rowid, text)
+        VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_comment_search_delete
+    AFTER DELETE ON blog_comment BEGIN
+        INSERT INTO blog_comment_search (blog_comment_search, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blog_comment_search_update
+    AFTER UPDATE OF text ON blog_comment BEGIN
+        INSERT INTO blog_comment_search (blog_comment_search, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO blog_comment_search (rowid, text)
+        VALUES (new.id, new.text);
+    END
+    """,
+    "INSERT INTO blog_comment_search (blog_comment_search) VALUES ('rebuild')",
+)
+DROP_INDEX = (
+    'DROP TRIGGER IF EXISTS blog_comment_search_insert',
+    'DROP TRIGGER IF EXISTS blog_comment_search_delete',
+    'DROP TRIGGER IF EXISTS blog_comment_search_update',
+    'DROP TABLE IF EXISTS blog_comment_search',
+)
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in CREATE_INDEX:
+        schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for sql in DROP_INDEX:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -7,10 +7,23 @@ from .forms import CommentForm, PostForm
 from .models import Comment, Post
 
 
-class OnlyAuthorMixin(UserPassesTestMixin):
+class SingleObjectCacheMixin:
+    """Загружает объект представления из БД один раз за запрос.
+
+    get_object() вызывают и проверка прав, и обработчик запроса;
+    без кэша каждый вызов выполняет отдельный SELECT.
+    """
+
+    def get_object(self, queryset=None):
+        if not hasattr(self, '_object'):
+            self._object = super().get_object(queryset)
+        return self._object
+
+
+class OnlyAuthorMixin(SingleObjectCacheMixin, UserPassesTestMixin):
 
     def test_func(self):
-        return self.get_object().author == self.request.user
+        return self.get_object().author_id == self.request.user.pk
 
 
 class PostMixin:
@@ -19,10 +32,10 @@ class PostMixin:
     template_name = 'blog/create.html'
 
 
-class PostDispatchMixin:
+class PostDispatchMixin(SingleObjectCacheMixin):
     def dispatch(self, request, *args, **kwargs):
         self.post_instance = self.get_object()
-        if self.post_instance.author != self.request.user:
+        if self.post_instance.author_id != self.request.user.pk:
             return redirect(
                 'blog:post_detail',
                 post_id=self.post_instance.id
@@ -41,3 +54,10 @@ class CommentMixin:
             'blog:post_detail',
             kwargs={'post_id': self.kwargs['post_id']}
         )
+
+
+class CommentAnchorMixin:
+    """Возвращает к комментарию на странице записи после сохранения."""
+
+    def get_success_url(self):
+        return f'{super().get_success_url()}?comment={self.object.pk}'
@@ -1,10 +1,14 @@
 """Модуль для моделей приложения blog."""
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import Truncator
 
 from core.models import CreatedPublishedModel, TitleModel
-from .constants import NAME_DISPLAY_LENGTH
+from .constants import EXCERPT_WORDS, NAME_DISPLAY_LENGTH
 
 User = get_user_model()
 
@@ -39,6 +43,54 @@ class Location(CreatedPublishedModel):
         return self.name[:NAME_DISPLAY_LENGTH]
 
 
+class PostQuerySet(models.QuerySet):
+
+    @staticmethod
+    def actual_comment_count():
+        """Выражение: число комментариев записи."""
+        return Coalesce(
+            Subquery(
+                Comment.objects.filter(post=OuterRef('pk'))
+                .order_by()
+                .values('post')
+                .annotate(total=Count('pk'))
+                .values('total')
+            ),
+            0
+        )
+
+    def update_comment_count(self):
+        """Пересчитывает счётчик комментариев записей."""
+        return self.update(comment_count=self.actual_comment_count())
+
+    def touch(self):
+        """Обновляет время изменения записей без вызова save()."""
+        return self.update(updated_at=timezone.now())
+
+    def comments_changed(self):
+        """Отмечает изменение комментариев записей.
+
+        Пересчитывает счётчик и сдвигает updated_at: время изменения
+        записи учитывает и её комментарии.
+        """
+        return self.update(
+            comment_count=self.actual_comment_count(),
+            updated_at=timezone.now()
+        )
+
+    def shift_comment_count(self, delta: int):
+        """Сдвигает счётчик комментариев на delta без пересчёта.
+
+        Годится, когда известно, как изменился один комментарий:
+        добавлен или удалён. Переносы и массовые изменения
+        пересчитываются через comments_changed().
+        """
+        return self.update(
+            comment_count=Greatest(F('comment_count') + delta, 0),
+            updated_at=timezone.now()
+        )
+
+
 class Post(TitleModel):
     text = models.TextField('Текст')
     pub_date = models.DateTimeField(
@@ -51,6 +103,7 @@ class Post(TitleModel):
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Автор публикации',
     )
     location = models.ForeignKey(
@@ -64,6 +117,7 @@ class Post(TitleModel):
         Category,
         on_delete=models.SET_NULL,
         null=True,
+        db_index=False,
         verbose_name='Категория',
     )
     image = models.ImageField(
@@ -71,25 +125,117 @@ class Post(TitleModel):
         upload_to='blogs_images',
         blank=True
     )
+    updated_at = models.DateTimeField(
+        'Изменено',
+        auto_now=True
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False
+    )
+    excerpt = models.TextField(
+        'Краткий текст',
+        blank=True,
+        editable=False
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         default_related_name = 'posts'
         ordering = ["-pub_date"]
+        # Индексы ленты: фильтр видимости и сортировка по pub_date.
+        # Условие is_published вынесено в частичный индекс ленты: булево
+        # поле в WHERE не сужает поиск по составному ключу. Отдельные
+        # индексы author и category заменены составными с этими полями
+        # в начале. Индекс category не частичный: по нему ищутся и все
+        # записи категории (SET_NULL при удалении, админка).
+        indexes = (
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_published_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+        )
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
 
+    @staticmethod
+    def make_excerpt(text):
+        """Возвращает начало текста для карточки записи в лентах."""
+        return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'text' in update_fields:
+            self.excerpt = self.make_excerpt(self.text)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse(
             'blog:profile',
             kwargs={'username': self.author.username}
         )
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Исходная категория нужна, чтобы при переносе записи
+        # сбросить кэш страницы и прежней категории.
+        instance.loaded_category_id = instance.__dict__.get('category_id')
+        # Исходное изображение: новое отправляется на обработку в очередь.
+        instance.loaded_image = instance.__dict__.get('image')
+        return instance
+
+
+class CommentQuerySet(models.QuerySet):
+    """QuerySet комментариев, поддерживающий Post.comment_count.
+
+    Массовые update() и bulk_create() не вызывают сигналы моделей,
+    поэтому счётчики и кэш страниц затронутых записей обновляются здесь.
+    Поисковый индекс комментариев ведут триггеры SQLite.
+    """
+
+    def update(self, **kwargs):
+        if not {'is_published', 'post', 'post_id', 'text'} & kwargs.keys():
+            return super().update(**kwargs)
+        post_ids = set(self.values_list('post_id', flat=True))
+        rows = super().update(**kwargs)
+        new_post = kwargs.get('post', kwargs.get('post_id'))
+        if new_post is not None:
+            post_ids.add(getattr(new_post, 'pk', new_post))
+        self._comments_changed(post_ids)
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        self._comments_changed({obj.post_id for obj in objs})
+        return objs
+
+    def _comments_changed(self, post_ids):
+        from .caching import invalidate_pages
+
+        Post.objects.filter(pk__in=post_ids).comments_changed()
+        invalidate_pages(*(f'post:{post_id}' for post_id in post_ids))
+
 
 class Comment(CreatedPublishedModel):
     text = models.TextField('Текст комментария')
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
+        db_index=False,
         verbose_name='Публикация'
     )
     author = models.ForeignKey(
@@ -98,11 +244,27 @@ class Comment(CreatedPublishedModel):
         verbose_name='Автор публикации'
     )
 
+    objects = CommentQuerySet.as_manager()
+
     class Meta:
         default_related_name = 'comments'
         ordering = ['created_at']
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx',
+            ),
+        )
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
 
     def __str__(self):
         return self.text[:NAME_DISPLAY_LENGTH]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем исходную запись, чтобы при переносе комментария
+        # пересчитать счётчик и у прежней публикации.
+        instance.loaded_post_id = instance.__dict__.get('post_id')
+        return instance
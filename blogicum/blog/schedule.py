@@ -0,0 +1,95 @@
+"""Учёт отложенных публикаций для кэшей и HTTP-заголовков.
+
+Ленты фильтруются по pub_date__lte=timezone.now(), поэтому любой
+закэшированный результат устаревает в момент, когда наступает дата
+ближайшей отложенной публикации. Этот модуль хранит такую дату
+для всей ленты, категории или автора.
+"""
+from datetime import datetime
+from typing import Optional
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_response_headers
+
+from .constants import NEXT_PUBLICATION_CACHE_TIMEOUT
+from .models import Post
+
+NEXT_PUBLICATION_VERSION_KEY = 'blog:next_publication_version'
+_MISSING = object()
+
+
+def invalidate_next_publications():
+    """Сбрасывает сохранённые даты ближайших публикаций."""
+    cache.set(NEXT_PUBLICATION_VERSION_KEY, uuid4().hex, None)
+
+
+def get_next_publication(
+        category_id: Optional[int] = None,
+        author_id: Optional[int] = None
+) -> Optional[datetime]:
+    """Возвращает дату ближайшей отложенной публикации или None.
+
+    Учитываются только записи, которые станут видны всем посетителям:
+    опубликованные и из опубликованной категории.
+
+    Параметры:
+        category_id (int): только записи этой категории
+        author_id (int): только записи этого автора
+    """
+    version = cache.get(NEXT_PUBLICATION_VERSION_KEY)
+    if version is None:
+        version = uuid4().hex
+        cache.add(NEXT_PUBLICATION_VERSION_KEY, version, None)
+    key = f'blog:next_publication:{version}:{category_id}:{author_id}'
+    now = timezone.now()
+    next_pub_date = cache.get(key, _MISSING)
+    if next_pub_date is not _MISSING and (
+        next_pub_date is None or next_pub_date > now
+    ):
+        return next_pub_date
+    queryset = Post.objects.filter(
+        is_published=True,
+        category__is_published=True,
+        pub_date__gt=now
+    )
+    if category_id is not None:
+        queryset = queryset.filter(category=category_id)
+    if author_id is not None:
+        queryset = queryset.filter(author=author_id)
+    next_pub_date = queryset.aggregate(
+        next_pub_date=Min('pub_date')
+    )['next_pub_date']
+    cache.set(
+        key,
+        next_pub_date,
+        seconds_until(next_pub_date, NEXT_PUBLICATION_CACHE_TIMEOUT)
+    )
+    return next_pub_date
+
+
+def seconds_until(moment: Optional[datetime], limit: int) -> int:
+    """Число секунд до moment, но не больше limit."""
+    if moment is None:
+        return limit
+    seconds = (moment - timezone.now()).total_seconds()
+    return max(0, min(limit, int(seconds)))
+
+
+def patch_publication_expiry(
+        request,
+        response,
+        next_pub_date: Optional[datetime],
+        limit: int
+):
+    """Выставляет Expires и Cache-Control по ближайшей публикации.
+
+    Страницы авторизованных пользователей персональны, поэтому им
+    разрешено только приватное хранение с обязательной проверкой.
+    """
+    if request.user.is_authenticated:
+        patch_cache_control(response, private=True, max_age=0)
+        return
+    patch_response_headers(response, seconds_until(next_pub_date, limit))
@@ -0,0 +1,430 @@
+"""Полнотекстовый поиск по записям блога и комментариям к ним.
+
+Бэкенд поиска выбирается по СУБД: для SQLite заголовки и тексты записей
+индексируются в таблице FTS5 blog_post_search, а комментарии — отдельными
+строками в blog_comment_search; для остальных СУБД записи ищутся через
+LIKE без индекса. Другой бэкенд задаётся путём к классу
+в BLOG_SEARCH_BACKEND.
+
+Индекс записей обновляется обработчиками сигналов Post. Индекс
+комментариев ведут триггеры SQLite, поэтому изменение комментария
+не переиндексирует запись. Команда rebuild_search_index строит оба
+индекса заново.
+"""
+import re
+from collections.abc import Sequence
+from typing import Iterable, List
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.db.models.expressions import RawSQL
+from django.utils.functional import cached_property
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+from .constants import SEARCH_MAX_TERMS, SEARCH_SNIPPET_WORDS, SEARCH_WEIGHTS
+from .models import Comment, Post
+
+INDEX_TABLE = 'blog_post_search'
+COMMENT_INDEX_TABLE = 'blog_comment_search'
+# Триггеры индекса комментариев, см. миграцию 0014. SQLite удаляет их
+# вместе с таблицей, когда миграция пересоздаёт blog_comment, поэтому
+# rebuild() создаёт их заново.
+COMMENT_TRIGGERS = (
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {COMMENT_INDEX_TABLE}_insert
+    AFTER INSERT ON blog_comment BEGIN
+        INSERT INTO {COMMENT_INDEX_TABLE} (rowid, text)
+        VALUES (new.id, new.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {COMMENT_INDEX_TABLE}_delete
+    AFTER DELETE ON blog_comment BEGIN
+        INSERT INTO {COMMENT_INDEX_TABLE} ({COMMENT_INDEX_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {COMMENT_INDEX_TABLE}_update
+    AFTER UPDATE OF text ON blog_comment BEGIN
+        INSERT INTO {COMMENT_INDEX_TABLE} ({COMMENT_INDEX_TABLE}, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO {COMMENT_INDEX_TABLE} (rowid, text)
+        VALUES (new.id, new.text);
+    END
+    """,
+)
+# Границы совпадений в тексте выдачи. Управляющие символы не меняются
+# при экранировании HTML, поэтому их заменяют на <mark> после него.
+MARK_START = '\x02'
+MARK_END = '\x03'
+ELLIPSIS = '…'
+# Сколько записей переиндексировать одним запросом.
+INDEX_BATCH_SIZE = 500
+
+BACKENDS = {
+    'sqlite': 'blog.search.FTS5SearchBackend',
+}
+DEFAULT_BACKEND = 'blog.search.LikeSearchBackend'
+
+
+def parse_query(query: str) -> List[str]:
+    """Разбивает строку запроса на слова в нижнем регистре."""
+    return [
+        term.lower() for term in re.findall(r'\w+', query)
+    ][:SEARCH_MAX_TERMS]
+
+
+def highlight(text: str) -> str:
+    """Экранирует текст и выделяет отмеченные совпадения тегом <mark>."""
+    return mark_safe(
+        escape(text)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
+
+
+class SearchResults(Sequence):
+    """Ленивая выдача поиска для django.core.paginator.Paginator.
+
+    Paginator вызывает count() и берёт срез страницы, поэтому бэкенд
+    выполняет только эти два запроса. Записи в выдаче получают атрибуты
+    search_title и search_snippet с выделенными совпадениями.
+    """
+
+    def __init__(self, backend, queryset: QuerySet, terms: List[str]):
+        self.backend = backend
+        self.queryset = queryset
+        self.terms = terms
+
+    def __repr__(self):
+        return f'<SearchResults {self.terms!r}>'
+
+    @cached_property
+    def _count(self):
+        if not self.terms:
+            return 0
+        return self.backend.count(self.queryset, self.terms)
+
+    def count(self) -> int:
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            if index < 0:
+                index += len(self)
+            items = self[index:index + 1]
+            if not items:
+                raise IndexError('SearchResults index out of range')
+            return items[0]
+        start, stop, _ = index.indices(len(self))
+        if start >= stop:
+            return []
+        return self.backend.fetch(
+            self.queryset, self.terms, start, stop - start
+        )
+
+
+class BaseSearchBackend:
+    """Бэкенд поиска: ведёт индекс и выполняет запросы к нему.
+
+    Методы индекса по умолчанию ничего не делают — так работают
+    бэкенды, которым отдельный индекс не нужен.
+    """
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS):
+        self.using = using
+
+    def search(self, queryset: QuerySet, query: str) -> SearchResults:
+        """Ищет query среди записей queryset.
+
+        Условия видимости задаёт queryset, см. get_filtered_posts().
+        """
+        return SearchResults(self, queryset, parse_query(query))
+
+    def count(self, queryset: QuerySet, terms: List[str]) -> int:
+        raise NotImplementedError
+
+    def fetch(
+            self,
+            queryset: QuerySet,
+            terms: List[str],
+            offset: int,
+            limit: int
+    ) -> List[Post]:
+        raise NotImplementedError
+
+    def update_posts(self, post_ids: Iterable[int]):
+        """Переиндексирует заголовки и тексты записей post_ids."""
+
+    def remove_posts(self, post_ids: Iterable[int]):
+        """Удаляет записи post_ids из индекса."""
+
+    def rebuild(self) -> int:
+        """Строит индекс заново и возвращает число записей в нём."""
+        return 0
+
+    def optimize(self):
+        """Сжимает индекс после множества мелких изменений."""
+
+    def filter_posts(self, queryset: QuerySet, query: str):
+        """Отбирает записи queryset с query в заголовке или тексте.
+
+        Используется поиском в админке. None означает, что индекса нет
+        и искать нужно через ModelAdmin.search_fields.
+        """
+        return None
+
+    def filter_comments(self, queryset: QuerySet, query: str):
+        """Отбирает комментарии queryset с query в тексте.
+
+        Как и filter_posts(), возвращает None, если индекса нет.
+        """
+        return None
+
+
+class LikeSearchBackend(BaseSearchBackend):
+    """Поиск без индекса: каждое слово ищется через LIKE.
+
+    Записи выводятся в порядке queryset, без ранжирования. Подходит
+    для СУБД без FTS5 и небольших баз; в SQLite LIKE без учёта регистра
+    сравнивает только латиницу.
+    """
+
+    def _filter(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(
+                Exists(Comment.objects.filter(
+                    post=OuterRef('pk'),
+                    is_published=True,
+                    text__icontains=term
+                ))
+                | Q(title__icontains=term)
+                | Q(text__icontains=term)
+            )
+        return queryset
+
+    def count(self, queryset, terms):
+        return self._filter(queryset, terms).count()
+
+    def fetch(self, queryset, terms, offset, limit):
+        pattern = re.compile(
+            '|'.join(map(re.escape, terms)), re.IGNORECASE
+        )
+        posts = list(
+            self._filter(queryset.defer(None), terms)[offset:offset + limit]
+        )
+        for post in posts:
+            post.search_title = highlight(self._mark(pattern, post.title))
+            post.search_snippet = highlight(
+                self._snippet(pattern, post.text)
+            )
+        return posts
+
+    @staticmethod
+    def _mark(pattern, text):
+        return pattern.sub(
+            lambda match: f'{MARK_START}{match.group()}{MARK_END}', text
+        )
+
+    def _snippet(self, pattern, text):
+        """Вырезает из text фрагмент вокруг первого совпадения."""
+        words = text.split()
+        first = next(
+            (i for i, word in enumerate(words) if pattern.search(word)), 0
+        )
+        start = max(0, first - SEARCH_SNIPPET_WORDS // 2)
+        stop = start + SEARCH_SNIPPET_WORDS
+        return ''.join((
+            ELLIPSIS if start else '',
+            self._mark(pattern, ' '.join(words[start:stop])),
+            ELLIPSIS if stop < len(words) else '',
+        ))
+
+
+class FTS5SearchBackend(BaseSearchBackend):
+    """Поиск по индексу FTS5 в SQLite с ранжированием BM25.
+
+    Строка индекса записей — запись блога (rowid = Post.id), строка
+    индекса комментариев — комментарий (rowid = Comment.id). Запись
+    находится, если все слова запроса есть в её заголовке и тексте или
+    в одном из её опубликованных комментариев; ранг записи — лучший
+    из рангов этих совпадений. Слова запроса ищутся по префиксу:
+    «рецепт» находит и «рецепты».
+    """
+
+    def _match(self, terms, columns=()):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        if columns:
+            match = f'{{{" ".join(columns)}}} : ({match})'
+        return match
+
+    def _filter_by_index(self, queryset, table, query, columns=()):
+        terms = parse_query(query)
+        if not terms:
+            return queryset
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {table} WHERE {table} MATCH %s',
+            [self._match(terms, columns)]
+        ))
+
+    def filter_posts(self, queryset, query):
+        return self._filter_by_index(
+            queryset, INDEX_TABLE, query, columns=('title', 'text')
+        )
+
+    def filter_comments(self, queryset, query):
+        return self._filter_by_index(queryset, COMMENT_INDEX_TABLE, query)
+
+    def _hits(self, queryset, terms):
+        """Совпадения в записях и комментариях видимых записей.
+
+        Строки: post_id, ранг, заголовок и фрагмент текста записи,
+        фрагмент лучшего комментария. Запись, найденная и по тексту,
+        и по комментариям, даёт две строки.
+        """
+        visible, params = (
+            queryset.order_by().values('pk').query
+            .get_compiler(using=self.using).as_sql()
+        )
+        title_weight, text_weight, comment_weight = SEARCH_WEIGHTS
+        match = self._match(terms)
+        sql = (
+            f'SELECT rowid AS post_id,'
+            f' bm25({INDEX_TABLE}, {title_weight}, {text_weight}) AS rank,'
+            f' highlight({INDEX_TABLE}, 0, %s, %s) AS title,'
+            f' snippet({INDEX_TABLE}, -1, %s, %s, %s, %s) AS snippet,'
+            f' NULL AS comment_snippet'
+            f' FROM {INDEX_TABLE}'
+            f' WHERE {INDEX_TABLE} MATCH %s AND rowid IN ({visible})'
+            f' UNION ALL '
+            # Для MIN() SQLite берёт snippet() из той же строки, поэтому
+            # фрагмент относится к лучшему комментарию записи.
+            # LIMIT -1 не даёт SQLite встроить подзапрос в группировку:
+            # там функции FTS5 недоступны.
+            f'SELECT post_id, MIN(rank) * {comment_weight}, NULL, NULL,'
+            f' snippet FROM ('
+            f'SELECT c.post_id, bm25({COMMENT_INDEX_TABLE}) AS rank,'
+            f' snippet({COMMENT_INDEX_TABLE}, 0, %s, %s, %s, %s) AS snippet'
+            f' FROM {COMMENT_INDEX_TABLE}'
+            f' JOIN {Comment._meta.db_table} c'
+            f' ON c.id = {COMMENT_INDEX_TABLE}.rowid'
+            f' WHERE {COMMENT_INDEX_TABLE} MATCH %s AND c.is_published'
+            f' AND c.post_id IN ({visible})'
+            f' LIMIT -1) GROUP BY post_id'
+        )
+        snippet_params = [
+            MARK_START, MARK_END, ELLIPSIS, SEARCH_SNIPPET_WORDS
+        ]
+        return sql, [
+            MARK_START, MARK_END, *snippet_params, match, *params,
+            *snippet_params, match, *params,
+        ]
+
+    def count(self, queryset, terms):
+        hits, params = self._hits(queryset, terms)
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(DISTINCT post_id) FROM ({hits})', params
+            )
+            return cursor.fetchone()[0]
+
+    def fetch(self, queryset, terms, offset, limit):
+        hits, params = self._hits(queryset, terms)
+        with connections[self.using].cursor() as cursor:
+            # У каждой записи не больше одной строки каждого вида,
+            # поэтому MAX() выбирает единственное непустое значение.
+            cursor.execute(
+                f'SELECT post_id, MAX(title),'
+                f' COALESCE(MAX(snippet), MAX(comment_snippet))'
+                f' FROM ({hits}) GROUP BY post_id'
+                f' ORDER BY MIN(rank), post_id'
+                f' LIMIT %s OFFSET %s',
+                [*params, limit, offset]
+            )
+            rows = cursor.fetchall()
+        posts = queryset.in_bulk([post_id for post_id, _, _ in rows])
+        results = []
+        for post_id, title, snippet in rows:
+            post = posts.get(post_id)
+            if post is None:
+                continue
+            post.search_title = highlight(
+                post.title if title is None else title
+            )
+            post.search_snippet = highlight(snippet)
+            results.append(post)
+        return results
+
+    def _index_sql(self, condition=''):
+        return (
+            f'INSERT INTO {INDEX_TABLE} (rowid, title, text)'
+            f' SELECT p.id, p.title, p.text'
+            f' FROM {Post._meta.db_table} p {condition}'
+        )
+
+    @staticmethod
+    def _batches(post_ids):
+        post_ids = sorted(set(post_ids))
+        for start in range(0, len(post_ids), INDEX_BATCH_SIZE):
+            yield post_ids[start:start + INDEX_BATCH_SIZE]
+
+    def update_posts(self, post_ids):
+        with transaction.atomic(using=self.using), \
+                connections[self.using].cursor() as cursor:
+            for batch in self._batches(post_ids):
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(
+                    f'DELETE FROM {INDEX_TABLE}'
+                    f' WHERE rowid IN ({placeholders})',
+                    batch
+                )
+                cursor.execute(
+                    self._index_sql(f'WHERE p.id IN ({placeholders})'),
+                    batch
+                )
+
+    def remove_posts(self, post_ids):
+        with connections[self.using].cursor() as cursor:
+            for batch in self._batches(post_ids):
+                placeholders = ', '.join(['%s'] * len(batch))
+                cursor.execute(
+                    f'DELETE FROM {INDEX_TABLE}'
+                    f' WHERE rowid IN ({placeholders})',
+                    batch
+                )
+
+    def rebuild(self):
+        with transaction.atomic(using=self.using), \
+                connections[self.using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {INDEX_TABLE}')
+            cursor.execute(self._index_sql())
+            indexed = cursor.rowcount
+            for sql in COMMENT_TRIGGERS:
+                cursor.execute(sql)
+            cursor.execute(
+                f'INSERT INTO {COMMENT_INDEX_TABLE} ({COMMENT_INDEX_TABLE})'
+                f' VALUES (\'rebuild\')'
+            )
+            return indexed
+
+    def optimize(self):
+        with connections[self.using].cursor() as cursor:
+            for table in (INDEX_TABLE, COMMENT_INDEX_TABLE):
+                cursor.execute(
+                    f'INSERT INTO {table} ({table}) VALUES (\'optimize\')'
+                )
+
+
+def get_search_backend(using: str = DEFAULT_DB_ALIAS) -> BaseSearchBackend:
+    """Возвращает бэкенд поиска для базы данных using."""
+    path = getattr(settings, 'BLOG_SEARCH_BACKEND', None) or BACKENDS.get(
+        connections[using].vendor, DEFAULT_BACKEND
+    )
+    return import_string(path)(using)
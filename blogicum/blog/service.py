@@ -1,24 +1,259 @@
 """Вспомогательные функции для приложения blog."""
-from typing import Any
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, List, Optional, Tuple, Type
+from uuid import uuid4
 
+from django.core.cache import cache
 from django.core.paginator import Page, Paginator
-from django.db.models import Count, Q, QuerySet
+from django.db import models
+from django.db.models import Q, QuerySet
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
 
-from .constants import NUM_OF_POSTS_PER_PAGE
-from .models import Post
+from .constants import (NUM_OF_COMMENTS_PER_PAGE, NUM_OF_POSTS_PER_PAGE,
+                        PAGINATOR_ON_EACH_SIDE, PAGINATOR_ON_ENDS,
+                        POST_COUNT_CACHE_TIMEOUT)
+from .models import Comment, Post
+
+CURSOR_NEXT = 'n'
+CURSOR_PREVIOUS = 'p'
+COMMENT_KEY = ('created_at', 'id')
+
+POST_COUNT_VERSION_KEY = 'blog:post_count_version'
+# Границы целых чисел, которые принимает SQLite.
+MAX_CURSOR_INT = 2 ** 63 - 1
+
+
+def invalidate_post_counts():
+    """Сбрасывает все закэшированные числа записей лент."""
+    cache.set(POST_COUNT_VERSION_KEY, uuid4().hex, None)
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator, который берёт число записей из кэша.
+
+    Ключ count_key описывает выборку: представление, категорию, автора
+    и видимость. Все ключи сбрасываются разом через
+    invalidate_post_counts() при изменении записей или категорий.
+    """
+
+    def __init__(
+            self,
+            object_list,
+            per_page,
+            count_key: Tuple[Any, ...],
+            timeout: int = POST_COUNT_CACHE_TIMEOUT,
+            **kwargs
+    ):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_key = count_key
+        self.timeout = timeout
+
+    @cached_property
+    def count(self):
+        version = cache.get(POST_COUNT_VERSION_KEY)
+        if version is None:
+            version = uuid4().hex
+            cache.add(POST_COUNT_VERSION_KEY, version, None)
+        key = 'blog:post_count:{}:{}'.format(
+            version, ':'.join(map(str, self.count_key))
+        )
+        count = cache.get(key)
+        if count is None:
+            count = self.object_list.count()
+            cache.set(key, count, self.timeout)
+        return count
+
+
+class KeysetPage(Sequence):
+    """Страница записей, выбранная по ключу (keyset) вместо OFFSET.
+
+    Повторяет интерфейс django.core.paginator.Page, который используется
+    в шаблонах, но вместо номеров страниц хранит курсоры соседних страниц.
+    """
+
+    is_keyset = True
+
+    def __init__(
+            self,
+            object_list,
+            next_cursor: Optional[str],
+            previous_cursor: Optional[str]
+    ):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+def encode_cursor(direction: str, values: Tuple[Any, ...]) -> str:
+    """Упаковывает направление и значения ключа в непрозрачный токен."""
+    payload = [
+        direction,
+        [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in values
+        ]
+    ]
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def _decode_cursor_value(field: models.Field, value: Any) -> Any:
+    """Проверяет значение ключа из курсора по типу поля field.
+
+    Возвращает None, если значение не подходит полю.
+    """
+    if isinstance(field, models.DateTimeField):
+        if not isinstance(value, str):
+            return None
+        try:
+            value = parse_datetime(value)
+        except ValueError:
+            return None
+        if value is None or timezone.is_naive(value):
+            return None
+        return value
+    if isinstance(field, models.IntegerField):
+        if (
+            isinstance(value, bool)
+            or not isinstance(value, int)
+            or abs(value) > MAX_CURSOR_INT
+        ):
+            return None
+        return value
+    return None
+
+
+def decode_cursor(
+        cursor: str,
+        fields: Tuple[str, ...],
+        model: Type[models.Model]
+) -> Optional[Tuple[str, Tuple[Any, ...]]]:
+    """Распаковывает токен курсора.
+
+    Значения ключа проверяются по типам полей fields модели model.
+    Возвращает None, если токен пустой или повреждён.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, values = json.loads(raw)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+    if (
+        direction not in (CURSOR_NEXT, CURSOR_PREVIOUS)
+        or not isinstance(values, list)
+        or len(values) != len(fields)
+    ):
+        return None
+    decoded = []
+    for field, value in zip(fields, values):
+        value = _decode_cursor_value(model._meta.get_field(field), value)
+        if value is None:
+            return None
+        decoded.append(value)
+    return direction, tuple(decoded)
+
+
+def _keyset_filter(fields: Tuple[str, ...], values, lookup: str) -> Q:
+    """Строит условие «ключ строго после values» для составного ключа."""
+    condition = Q()
+    for position, field in enumerate(fields):
+        step = Q(**{f'{field}__{lookup}': values[position]})
+        for previous, value in zip(fields[:position], values):
+            step &= Q(**{previous: value})
+        condition |= step
+    return condition
+
+
+def get_keyset_page(
+        queryset: QuerySet,
+        cursor: Optional[str],
+        fields: Tuple[str, ...] = ('pub_date', 'id'),
+        descending: bool = True,
+        per_page: int = NUM_OF_POSTS_PER_PAGE
+) -> KeysetPage:
+    """Возвращает страницу выборки по составному ключу fields.
+
+    Стоимость запроса не зависит от глубины страницы: вместо OFFSET
+    выборка продолжается от ключа последней показанной записи.
+
+    Параметры:
+        cursor (str): токен из ?cursor=, пустой — первая страница
+        fields (tuple): поля ключа, последнее должно быть уникальным
+        descending (bool): порядок вывода — по убыванию ключа
+    """
+    decoded = decode_cursor(cursor, fields, queryset.model)
+    direction, values = decoded or (CURSOR_NEXT, None)
+    backwards = direction == CURSOR_PREVIOUS
+    reverse = descending != backwards
+    queryset = queryset.order_by(
+        *(f'-{field}' if reverse else field for field in fields)
+    )
+    if values is not None:
+        queryset = queryset.filter(
+            _keyset_filter(fields, values, 'lt' if reverse else 'gt')
+        )
+    object_list = list(queryset[:per_page + 1])
+    has_more = len(object_list) > per_page
+    object_list = object_list[:per_page]
+    if backwards:
+        object_list.reverse()
+
+    def key(obj):
+        return tuple(getattr(obj, field) for field in fields)
+
+    has_next = has_more if not backwards else True
+    has_previous = has_more if backwards else values is not None
+    if not object_list:
+        return KeysetPage(object_list, None, None)
+    return KeysetPage(
+        object_list,
+        encode_cursor(CURSOR_NEXT, key(object_list[-1]))
+        if has_next else None,
+        encode_cursor(CURSOR_PREVIOUS, key(object_list[0]))
+        if has_previous else None,
+    )
 
 
 def get_filtered_posts(
         request,
         all_posts=None,
-        annotate=None
+        defer_text=None
 ) -> QuerySet[Post]:
     """Возвращает QuerySet отфильтрованных записей блогов.
 
+    Количество комментариев хранится в поле Post.comment_count,
+    поэтому агрегация по таблице комментариев не нужна.
+
     Параметры:
             all_posts (bool): если True, то выбираются все записи блога
-            annotate (bool): если True, выполняется подсчет кол-ва комментариев
+            defer_text (bool): если True, полный текст записей не
+                загружается — карточкам лент хватает Post.excerpt
     """
     queryset = Post.objects.select_related(
         'author',
@@ -40,20 +275,88 @@ def get_filtered_posts(
             category__is_published=True,
             pub_date__lte=timezone.now()
         )
-    if annotate:
-        queryset = queryset.annotate(comment_count=Count('comments'))
-        queryset = queryset.order_by('-pub_date')
-    return queryset
+    if defer_text:
+        queryset = queryset.defer('text')
+    return queryset.order_by('-pub_date', '-id')
 
 
-def get_paginated_posts(request, post_list: QuerySet[Post]) -> Page[Any]:
+def get_elided_page_range(page_obj: Page) -> List[Any]:
+    """Возвращает номера страниц для шаблона includes/paginator.html.
+
+    Вместо всех страниц выводятся первая и последняя, соседние
+    с текущей и многоточия (Paginator.ELLIPSIS) между ними, поэтому
+    размер навигации не растёт с числом страниц.
+    """
+    return list(page_obj.paginator.get_elided_page_range(
+        page_obj.number,
+        on_each_side=PAGINATOR_ON_EACH_SIDE,
+        on_ends=PAGINATOR_ON_ENDS
+    ))
+
+
+def get_paginated_posts(
+        request,
+        post_list: QuerySet[Post],
+        count_key: Optional[Tuple[Any, ...]] = None,
+        count_timeout: int = POST_COUNT_CACHE_TIMEOUT
+) -> Page[Any]:
     """
     Возвращает разбитые на страницы записи блога.
 
+    Если в запросе передан параметр ?cursor=, записи выбираются по ключу
+    (pub_date, id) и возвращается KeysetPage; иначе — обычная страница
+    по номеру из ?page=.
+
     Параметры:
         post_list (QuerySet[Post]): QuerySet выбираемых записей блогов
+        count_key (tuple): ключ кэша для числа записей, см.
+            CachedCountPaginator; без него COUNT(*) выполняется всегда
+        count_timeout (int): время жизни числа записей в кэше
     """
-    paginator = Paginator(post_list, NUM_OF_POSTS_PER_PAGE)
+    if 'cursor' in request.GET:
+        return get_keyset_page(post_list, request.GET['cursor'])
+    if count_key is None:
+        paginator = Paginator(post_list, NUM_OF_POSTS_PER_PAGE)
+    else:
+        paginator = CachedCountPaginator(
+            post_list, NUM_OF_POSTS_PER_PAGE, count_key, count_timeout
+        )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    page_obj.elided_page_range = get_elided_page_range(page_obj)
     return page_obj
+
+
+def get_paginated_comments(request, post: Post) -> KeysetPage:
+    """Возвращает страницу комментариев к записи post.
+
+    Комментарии выбираются по ключу (created_at, id) от старых к новым,
+    курсор страницы передаётся в параметре ?comments=.
+    """
+    return get_keyset_page(
+        post.comments.select_related('author'),
+        request.GET.get('comments'),
+        fields=COMMENT_KEY,
+        descending=False,
+        per_page=NUM_OF_COMMENTS_PER_PAGE
+    )
+
+
+def get_comment_page_cursor(comment: Comment) -> str:
+    """Возвращает курсор страницы комментариев, где выводится comment.
+
+    Страницы, по которым переходят от первой, начинаются с комментариев
+    с номерами, кратными NUM_OF_COMMENTS_PER_PAGE; курсор указывает
+    на последний комментарий предыдущей такой страницы.
+    """
+    comments = Comment.objects.filter(post=comment.post_id)
+    position = comments.filter(_keyset_filter(
+        COMMENT_KEY, (comment.created_at, comment.pk), 'lt'
+    )).count()
+    start = position - position % NUM_OF_COMMENTS_PER_PAGE
+    if not start:
+        return ''
+    return encode_cursor(
+        CURSOR_NEXT,
+        comments.order_by(*COMMENT_KEY).values_list(*COMMENT_KEY)[start - 1]
+    )
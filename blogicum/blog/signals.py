@@ -0,0 +1,181 @@
+"""Обработчики сигналов моделей приложения blog."""
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+
+from core.jobs import enqueue
+
+from .admin_filters import invalidate_admin_choices
+from .caching import invalidate_pages
+from .models import Category, Comment, Location, Post
+from .schedule import invalidate_next_publications
+from .search import get_search_backend
+from .service import invalidate_post_counts
+
+
+def _comment_count_delta(instance, created):
+    """Изменение счётчика записи после сохранения комментария.
+
+    Возвращает None, если исходная запись комментария неизвестна
+    или он перенесён к другой записи, — тогда счётчик пересчитывается.
+    """
+    if created:
+        return 1
+    loaded_post_id = getattr(instance, 'loaded_post_id', None)
+    if loaded_post_id is None or loaded_post_id != instance.post_id:
+        return None
+    return 0
+
+
+@receiver(post_save, sender=Comment)
+def update_post_comment_count(
+        sender, instance, using, created, update_fields=None, **kwargs
+):
+    """Обновляет счётчик и время изменения записи."""
+    post_ids = {instance.post_id, getattr(instance, 'loaded_post_id', None)}
+    post_ids.discard(None)
+    posts = Post.objects.filter(pk__in=post_ids)
+    delta = _comment_count_delta(instance, created)
+    if delta is None:
+        posts.comments_changed()
+    else:
+        posts.shift_comment_count(delta)
+    # Запоминаем запись, сохранённую в базе: поле вне update_fields
+    # осталось прежним.
+    if update_fields is None or 'post' in update_fields:
+        instance.loaded_post_id = instance.post_id
+
+
+@receiver(post_delete, sender=Comment)
+def update_post_comment_count_on_delete(sender, instance, using, **kwargs):
+    """Уменьшает счётчик записи удалённого комментария."""
+    post_id = getattr(instance, 'loaded_post_id', None) or instance.post_id
+    Post.objects.filter(pk=post_id).shift_comment_count(-1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_post_counts(sender, **kwargs):
+    """Сбрасывает закэшированные числа записей и даты публикаций."""
+    invalidate_post_counts()
+    invalidate_next_publications()
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_posts(sender, instance, **kwargs):
+    """Сбрасывает кэш карточек записей изменённой категории."""
+    Post.objects.filter(category=instance).touch()
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def touch_location_posts(sender, instance, **kwargs):
+    """Сбрасывает кэш карточек записей изменённого местоположения."""
+    Post.objects.filter(location=instance).touch()
+
+
+@receiver(pre_save, sender=get_user_model())
+def touch_author_posts(sender, instance, update_fields=None, **kwargs):
+    """Сбрасывает кэш страниц с записями и комментариями автора.
+
+    Срабатывает, только если автор сменил username.
+
+    Остальные поля пользователя на этих страницах не выводятся, поэтому,
+    например, обновление last_login при входе ничего не сбрасывает.
+    """
+    if instance.pk is None:
+        return
+    if update_fields is not None and 'username' not in update_fields:
+        return
+    if not sender.objects.filter(
+            pk=instance.pk
+    ).exclude(username=instance.username).exists():
+        return
+    Post.objects.filter(author=instance).touch()
+    Post.objects.filter(comments__author=instance).touch()
+    invalidate_pages(f'user:{instance.pk}')
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_pages(sender, instance, **kwargs):
+    """Сбрасывает кэш страниц, на которых выводится запись."""
+    category_ids = {
+        instance.category_id,
+        getattr(instance, 'loaded_category_id', None)
+    }
+    category_ids.discard(None)
+    invalidate_pages(
+        'feed',
+        f'post:{instance.pk}',
+        *(f'category:{category_id}' for category_id in category_ids)
+    )
+    instance.loaded_category_id = instance.category_id
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_pages(sender, instance, **kwargs):
+    """Сбрасывает кэш страниц записи с комментарием и лент с ней."""
+    invalidate_pages(f'post:{instance.post_id}')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_pages(sender, instance, **kwargs):
+    """Сбрасывает кэш страниц с записями категории.
+
+    Лента зависит от категории целиком: снятие категории с публикации
+    меняет состав ленты.
+    """
+    invalidate_pages('feed', f'category:{instance.pk}')
+
+
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_location_pages(sender, instance, **kwargs):
+    """Сбрасывает кэш страниц с записями местоположения."""
+    invalidate_pages(f'location:{instance.pk}')
+
+
+@receiver(post_save, sender=Post)
+def queue_post_image_processing(sender, instance, **kwargs):
+    """Ставит в очередь обработку нового изображения записи.
+
+    Поворот, удаление EXIF и копии изображения готовит задача
+    blog.process_post_image, поэтому сохранение формы не ждёт Pillow.
+    """
+    name = instance.image.name if instance.image else ''
+    if name and name != getattr(instance, 'loaded_image', None):
+        enqueue('blog.process_post_image', post_id=instance.pk, name=name)
+    instance.loaded_image = name
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, using, update_fields=None, **kwargs):
+    """Обновляет запись в поисковом индексе.
+
+    Сохранение без title и text в update_fields индекс не меняет.
+    """
+    if update_fields is not None and not {'title', 'text'} & set(
+            update_fields
+    ):
+        return
+    get_search_backend(using).update_posts([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, using, **kwargs):
+    """Удаляет запись из поискового индекса."""
+    get_search_backend(using).remove_posts([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def reset_admin_choices(sender, **kwargs):
+    """Сбрасывает закэшированный фильтр админки по категориям."""
+    invalidate_admin_choices(sender)
@@ -0,0 +1,38 @@
+"""Фоновые задачи приложения blog."""
+from PIL import Image, UnidentifiedImageError
+
+from core.jobs import task
+
+from .caching import invalidate_pages
+from .models import Post
+from .thumbnails import get_renditions, normalize_original
+
+
+@task('blog.process_post_image')
+def process_post_image(post_id, name, force=False):
+    """Обрабатывает загруженное изображение записи.
+
+    Исправляет поворот и удаляет EXIF оригинала, затем готовит копии
+    изображения и сбрасывает кэш страниц, где выводится запись. Если
+    запись удалена или изображение уже заменено, ничего не делает.
+    С force копии создаются заново, даже если они уже готовы.
+    """
+    post = Post.objects.filter(pk=post_id).only('id', 'image').first()
+    if post is None or post.image.name != name:
+        return
+    storage = post.image.storage
+    try:
+        new_name = normalize_original(post.image)
+    except (UnidentifiedImageError, Image.DecompressionBombError):
+        # Повтор не поможет: в шаблонах останется оригинал.
+        return
+    if new_name:
+        if Post.objects.filter(pk=post_id, image=name).update(image=new_name):
+            storage.delete(name)
+            post.image.name = new_name
+        else:
+            storage.delete(new_name)
+            return
+    get_renditions(post.image, force=force)
+    Post.objects.filter(pk=post_id).touch()
+    invalidate_pages(f'post:{post_id}')
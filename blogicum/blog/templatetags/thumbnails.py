@@ -0,0 +1,44 @@
+"""Теги шаблонов для вывода уменьшенных копий изображений.
+
+Теги не создают копии: пока фоновая задача их не подготовила,
+выводится оригинал.
+"""
+from django import template
+
+from ..thumbnails import FALLBACK, WEBP, get_renditions
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail_url(image, size):
+    """Возвращает адрес копии размера size или оригинала."""
+    renditions = get_renditions(image, generate=False)
+    if not renditions:
+        return image.url if image else ''
+    for rendition in renditions[FALLBACK]:
+        if rendition.size == size:
+            return rendition.url
+    return image.url
+
+
+@register.simple_tag
+def thumbnail_srcset(image, image_format=FALLBACK):
+    """Возвращает значение атрибута srcset из копий изображения.
+
+    Параметры:
+        image_format (str): 'webp' или 'fallback' — JPEG/PNG
+    """
+    if image_format not in (WEBP, FALLBACK):
+        raise template.TemplateSyntaxError(
+            f'Неизвестный формат копий: {image_format}'
+        )
+    renditions = get_renditions(image, generate=False)
+    if not renditions:
+        return ''
+    candidates = {}
+    for rendition in renditions[image_format]:
+        candidates.setdefault(rendition.width, rendition.url)
+    return ', '.join(
+        f'{url} {width}w' for width, url in candidates.items()
+    )
@@ -0,0 +1,211 @@
+"""Уменьшенные копии изображений записей блога.
+
+Копии создаются Pillow для каждого размера из THUMBNAIL_SIZES в двух
+форматах: WebP и запасном (JPEG или PNG для изображений с прозрачностью).
+Имена файлов строятся по хешу содержимого оригинала и размерам копии
+в пикселях, поэтому одинаковые изображения делят копии, готовый файл
+не создаётся повторно, а после изменения THUMBNAIL_SIZES копии новых
+размеров получают новые имена.
+
+Список готовых копий оригинала хранится рядом с ними в файле-манифесте:
+копии создаёт фоновая задача, а веб-процессу достаточно прочитать
+манифест, не открывая оригинал.
+"""
+import hashlib
+import json
+import logging
+from io import BytesIO
+from typing import Dict, List, NamedTuple, Optional
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db.models.fields.files import FieldFile
+from PIL import Image, ImageOps
+
+from .constants import (ORIGINAL_JPEG_QUALITY, THUMBNAIL_CACHE_TIMEOUT,
+                        THUMBNAIL_DIR, THUMBNAIL_MISSING_CACHE_TIMEOUT,
+                        THUMBNAIL_QUALITY, THUMBNAIL_SIZES)
+
+logger = logging.getLogger(__name__)
+
+WEBP = 'webp'
+FALLBACK = 'fallback'
+# Значение в кэше вместо копий, пока манифеста нет.
+MISSING = {}
+
+FORMATS = {
+    'JPEG': ('jpg', 'image/jpeg'),
+    'PNG': ('png', 'image/png'),
+    'WEBP': ('webp', 'image/webp'),
+}
+
+
+class Rendition(NamedTuple):
+    """Готовая копия изображения."""
+
+    size: str
+    url: str
+    width: int
+    height: int
+    content_type: str
+
+
+def _cache_key(image: FieldFile) -> str:
+    return f'blog:renditions:{image.name}'
+
+
+def _manifest_name(image: FieldFile) -> str:
+    digest = hashlib.sha256(image.name.encode()).hexdigest()
+    return f'{THUMBNAIL_DIR}/manifests/{digest[:2]}/{digest}.json'
+
+
+def _read_manifest(image: FieldFile) -> Optional[Dict[str, List[Rendition]]]:
+    name = _manifest_name(image)
+    try:
+        with image.storage.open(name, 'rb') as file:
+            data = json.load(file)
+        return {
+            key: [Rendition(*item) for item in items]
+            for key, items in data.items()
+        }
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def _write_manifest(image: FieldFile, renditions: Dict[str, List[Rendition]]):
+    name = _manifest_name(image)
+    if image.storage.exists(name):
+        image.storage.delete(name)
+    image.storage.save(name, ContentFile(json.dumps(renditions).encode()))
+
+
+def _has_alpha(source: Image.Image) -> bool:
+    return source.mode in ('RGBA', 'LA') or (
+        source.mode == 'P' and 'transparency' in source.info
+    )
+
+
+def _encode(source: Image.Image, image_format: str) -> bytes:
+    if image_format == 'JPEG' and source.mode != 'RGB':
+        source = source.convert('RGB')
+    buffer = BytesIO()
+    source.save(
+        buffer, image_format, quality=THUMBNAIL_QUALITY, optimize=True
+    )
+    return buffer.getvalue()
+
+
+def generate_renditions(image: FieldFile) -> Dict[str, List[Rendition]]:
+    """Создаёт недостающие копии изображения и возвращает все копии.
+
+    Результат — словарь с ключами WEBP и FALLBACK, в каждом копии
+    по возрастанию размера. Копии не бывают больше оригинала.
+    """
+    storage = image.storage
+    with storage.open(image.name, 'rb') as file:
+        data = file.read()
+    digest = hashlib.sha256(data).hexdigest()[:24]
+    renditions = {WEBP: [], FALLBACK: []}
+    with Image.open(BytesIO(data)) as source:
+        source = ImageOps.exif_transpose(source)
+        fallback = 'PNG' if _has_alpha(source) else 'JPEG'
+        for size, side in sorted(
+                THUMBNAIL_SIZES.items(), key=lambda item: item[1]
+        ):
+            resized = source.copy()
+            resized.thumbnail((side, side), Image.Resampling.LANCZOS)
+            for key, image_format in ((WEBP, 'WEBP'), (FALLBACK, fallback)):
+                extension, content_type = FORMATS[image_format]
+                previous = renditions[key][-1] if renditions[key] else None
+                if previous and (
+                        previous.width, previous.height
+                ) == resized.size:
+                    # Оригинал меньше размера: копия совпала бы с прошлой.
+                    renditions[key].append(previous._replace(size=size))
+                    continue
+                width, height = resized.size
+                name = (
+                    f'{THUMBNAIL_DIR}/{digest[:2]}/'
+                    f'{digest}-{width}x{height}.{extension}'
+                )
+                if not storage.exists(name):
+                    name = storage.save(
+                        name, ContentFile(_encode(resized, image_format))
+                    )
+                renditions[key].append(Rendition(
+                    size, storage.url(name), *resized.size, content_type
+                ))
+    return renditions
+
+
+def normalize_original(image: FieldFile) -> Optional[str]:
+    """Поворачивает оригинал по тегу EXIF Orientation и удаляет EXIF.
+
+    Исправленный оригинал сохраняется в новый файл, имя которого
+    возвращается. Если метаданных нет, а также для анимаций и форматов
+    кроме JPEG, PNG и WebP возвращает None — оригинал не меняется.
+    """
+    storage = image.storage
+    with storage.open(image.name, 'rb') as file:
+        data = file.read()
+    with Image.open(BytesIO(data)) as source:
+        if (
+            source.format not in FORMATS
+            or getattr(source, 'is_animated', False)
+            or not (source.getexif() or 'exif' in source.info)
+        ):
+            return None
+        image_format = source.format
+        options = {}
+        if source.info.get('icc_profile'):
+            options['icc_profile'] = source.info['icc_profile']
+        if image_format == 'JPEG':
+            options['quality'] = ORIGINAL_JPEG_QUALITY
+        normalized = ImageOps.exif_transpose(source)
+        normalized.info.pop('exif', None)
+        buffer = BytesIO()
+        normalized.save(buffer, image_format, **options)
+    return storage.save(image.name, ContentFile(buffer.getvalue()))
+
+
+def get_renditions(
+        image: FieldFile,
+        generate: bool = True,
+        force: bool = False
+) -> Optional[Dict[str, List[Rendition]]]:
+    """Возвращает копии изображения.
+
+    Готовые копии ищутся в кэше и в манифесте. Если их нет, они
+    создаются, только когда generate равен True; шаблоны передают False
+    и до выполнения фоновой задачи выводят оригинал. Отсутствие
+    манифеста тогда ненадолго запоминается в кэше. С force копии
+    создаются заново без кэша и манифеста, например после изменения
+    THUMBNAIL_SIZES.
+
+    Если оригинал не читается или не является изображением, возвращает
+    None — в шаблоне тогда тоже выводится оригинал.
+    """
+    if not image:
+        return None
+    key = _cache_key(image)
+    renditions = None if force else cache.get(key)
+    if renditions:
+        return renditions
+    if renditions is not None and not generate:
+        return None
+    renditions = None if force else _read_manifest(image)
+    if renditions is None:
+        if not generate:
+            cache.set(key, MISSING, THUMBNAIL_MISSING_CACHE_TIMEOUT)
+            return None
+        try:
+            renditions = generate_renditions(image)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            logger.warning(
+                'Не удалось создать копии изображения %s', image.name,
+                exc_info=True
+            )
+            return None
+        _write_manifest(image, renditions)
+    cache.set(key, renditions, THUMBNAIL_CACHE_TIMEOUT)
+    return renditions
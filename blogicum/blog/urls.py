@@ -1,9 +1,15 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from . import async_views, views
 
 app_name = 'blog'
 
+# Под ASGI страницы чтения обслуживают асинхронные представления.
+read_views = (
+    async_views if getattr(settings, 'BLOG_ASYNC_VIEWS', False) else views
+)
+
 urlpatterns = [
     path(
         'posts/create/',
@@ -12,7 +18,7 @@ urlpatterns = [
     ),
     path(
         'posts/<int:post_id>/',
-        views.post_detail,
+        read_views.post_detail,
         name='post_detail'
     ),
     path(
@@ -42,18 +48,23 @@ urlpatterns = [
     ),
     path(
         'category/<slug:category_slug>/',
-        views.category_posts,
+        read_views.category_posts,
         name='category_posts'
     ),
     path(
         'profile/<str:username>/',
-        views.user_profile,
+        read_views.user_profile,
         name='profile'
     ),
+    path(
+        'search/',
+        views.search,
+        name='search'
+    ),
     path(
         'profile/',
         views.edit_profile,
         name='edit_profile'
     ),
-    path('', views.index, name='index')
+    path('', read_views.index, name='index')
 ]
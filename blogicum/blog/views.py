@@ -2,35 +2,71 @@
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.paginator import Paginator
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.http import urlencode
 from django.views.generic import CreateView, DeleteView, UpdateView
 
+from .caching import (add_page_dependencies, add_posts_dependencies,
+                      cache_anonymous_page)
+from .conditional import PageValidators, page_state
+from .constants import (NUM_OF_POSTS_PER_PAGE, PAGE_CACHE_TIMEOUT,
+                        POST_CARD_CACHE_TIMEOUT, POST_COUNT_CACHE_TIMEOUT)
 from .forms import CommentForm, EditProfileForm, PostForm
-from .mixins import CommentMixin, OnlyAuthorMixin, PostDispatchMixin, PostMixin
-from .models import Category, Post
-from .service import get_filtered_posts, get_paginated_posts
+from .mixins import (CommentAnchorMixin, CommentMixin, OnlyAuthorMixin,
+                     PostDispatchMixin, PostMixin)
+from .models import Category, Comment, Post
+from .schedule import (get_next_publication, patch_publication_expiry,
+                       seconds_until)
+from .search import get_search_backend
+from .service import (get_comment_page_cursor, get_elided_page_range,
+                      get_filtered_posts, get_paginated_comments,
+                      get_paginated_posts)
 
 User = get_user_model()
 
 
+@cache_anonymous_page
 def index(request):
     """Обрабатывает запрос к главной странице 'Лента записей'."""
-    post_list = (get_filtered_posts(request, annotate=True)
-                 )
-    return render(
+    next_pub_date = get_next_publication()
+    post_list = get_filtered_posts(request, defer_text=True)
+    page_obj = get_paginated_posts(
+        request,
+        post_list,
+        count_key=('index',),
+        count_timeout=seconds_until(next_pub_date, POST_COUNT_CACHE_TIMEOUT)
+    )
+    add_page_dependencies(request, 'feed')
+    add_posts_dependencies(request, page_obj)
+    # Самая поздняя отметка времени на странице может уменьшиться
+    # (например, при удалении новейшей записи), поэтому Last-Modified
+    # не отдаётся и страница проверяется только по ETag.
+    validators = PageValidators(request, page_state(page_obj))
+    response = validators.not_modified() or render(
         request,
         'blog/index.html',
         {
-            'page_obj': get_paginated_posts(request, post_list)
+            'page_obj': page_obj,
+            'post_card_cache_timeout': POST_CARD_CACHE_TIMEOUT,
         }
     )
+    validators.patch(response)
+    patch_publication_expiry(
+        request, response, next_pub_date, PAGE_CACHE_TIMEOUT
+    )
+    return response
 
 
+@cache_anonymous_page
 def post_detail(request, post_id: int):
     """Обрабатывает запрос к странице записи блога.
 
+    Запрос с ?comment=<id> перенаправляется на страницу комментариев,
+    где выводится этот комментарий, с якорем #comment_<id>.
+
     Параметры:
             post_id (int): номер записи блога
     """
@@ -39,15 +75,46 @@ def post_detail(request, post_id: int):
         pk=post_id
     )
 
+    if request.GET.get('comment', '').isdigit():
+        comment = get_object_or_404(
+            Comment, pk=request.GET['comment'], post=post
+        )
+        return redirect(
+            '{}?comments={}#comment_{}'.format(
+                reverse('blog:post_detail', kwargs={'post_id': post.pk}),
+                get_comment_page_cursor(comment),
+                comment.pk
+            )
+        )
+    comments = get_paginated_comments(request, post)
+    add_posts_dependencies(request, [post])
+    add_page_dependencies(
+        request,
+        *(f'user:{author_id}' for author_id in {
+            comment.author_id for comment in comments
+        })
+    )
+    # Post.updated_at сдвигается и при изменении комментариев.
+    validators = PageValidators(
+        request,
+        post.pk,
+        post.updated_at,
+        [comment.pk for comment in comments],
+        last_modified=post.updated_at
+    )
     context = {
         'form': CommentForm(),
         'post': post,
-        'comments': post.comments.select_related('post')
+        'comments': comments
     }
 
-    return render(request, 'blog/detail.html', context)
+    response = validators.not_modified() or render(
+        request, 'blog/detail.html', context
+    )
+    return validators.patch(response)
 
 
+@cache_anonymous_page
 def category_posts(request, category_slug):
     """Обрабатывает запрос к странице публикаций блогов по категории.
 
@@ -60,31 +127,108 @@ def category_posts(request, category_slug):
         is_published=True
     )
 
+    next_pub_date = get_next_publication(category_id=category.pk)
     post_list = (
-        get_filtered_posts(request, annotate=True)
+        get_filtered_posts(request, defer_text=True)
         .filter(category=category)
     )
 
-    return render(request,
-                  'blog/category.html',
-                  {
-                      'category': category,
-                      'page_obj': get_paginated_posts(request, post_list),
-                  }
-                  )
+    page_obj = get_paginated_posts(
+        request,
+        post_list,
+        count_key=('category', category.pk),
+        count_timeout=seconds_until(next_pub_date, POST_COUNT_CACHE_TIMEOUT)
+    )
+    add_page_dependencies(request, f'category:{category.pk}')
+    add_posts_dependencies(request, page_obj)
+    # Заголовок и описание категории не имеют отметки времени,
+    # поэтому страница проверяется только по ETag.
+    validators = PageValidators(
+        request,
+        category.title,
+        category.description,
+        page_state(page_obj)
+    )
+    response = validators.not_modified() or render(
+        request,
+        'blog/category.html',
+        {
+            'category': category,
+            'page_obj': page_obj,
+            'post_card_cache_timeout': POST_CARD_CACHE_TIMEOUT,
+        }
+    )
+    validators.patch(response)
+    patch_publication_expiry(
+        request, response, next_pub_date, PAGE_CACHE_TIMEOUT
+    )
+    return response
 
 
 def user_profile(request, username):
     profile = get_object_or_404(User, username=username)
+    is_owner = request.user == profile
+    # Автор видит и свои отложенные записи, его лента по времени
+    # не меняется.
+    next_pub_date = (
+        None if is_owner else get_next_publication(author_id=profile.pk)
+    )
     post_list = (
-        get_filtered_posts(request, all_posts=True, annotate=True)
+        get_filtered_posts(request, all_posts=True, defer_text=True)
         .filter(author=profile.pk)
     )
+    page_obj = get_paginated_posts(
+        request,
+        post_list,
+        count_key=('profile', profile.pk, is_owner),
+        count_timeout=seconds_until(next_pub_date, POST_COUNT_CACHE_TIMEOUT)
+    )
+    validators = PageValidators(
+        request,
+        profile.username,
+        profile.get_full_name(),
+        profile.date_joined,
+        profile.is_staff,
+        page_state(page_obj)
+    )
     context = {
         'profile': profile,
-        'page_obj': get_paginated_posts(request, post_list)
+        'page_obj': page_obj,
+        'post_card_cache_timeout': POST_CARD_CACHE_TIMEOUT,
     }
-    return render(request, 'blog/profile.html', context)
+    response = validators.not_modified() or render(
+        request, 'blog/profile.html', context
+    )
+    validators.patch(response)
+    patch_publication_expiry(
+        request, response, next_pub_date, PAGE_CACHE_TIMEOUT
+    )
+    return response
+
+
+def search(request):
+    """Обрабатывает запрос к странице поиска по записям и комментариям.
+
+    Ищутся только записи, видимые в ленте, см. get_filtered_posts().
+    """
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        post_list = get_filtered_posts(request, defer_text=True)
+        results = get_search_backend(post_list.db).search(post_list, query)
+        page_obj = Paginator(results, NUM_OF_POSTS_PER_PAGE).get_page(
+            request.GET.get('page')
+        )
+        page_obj.elided_page_range = get_elided_page_range(page_obj)
+    return render(
+        request,
+        'blog/search.html',
+        {
+            'query': query,
+            'page_obj': page_obj,
+            'page_query': urlencode({'q': query}) + '&',
+        }
+    )
 
 
 @login_required
@@ -137,9 +281,8 @@ class PostDeleteView(
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        post_instance = self.get_object()
         context.update({
-            'form': PostForm(instance=post_instance),
+            'form': PostForm(instance=self.object),
         })
         return context
 
@@ -152,6 +295,7 @@ class PostDeleteView(
 
 class CommentCreateView(
     LoginRequiredMixin,
+    CommentAnchorMixin,
     CommentMixin,
     CreateView
 ):
@@ -166,6 +310,7 @@ class CommentCreateView(
 class CommentUpdateView(
     LoginRequiredMixin,
     OnlyAuthorMixin,
+    CommentAnchorMixin,
     CommentMixin,
     UpdateView
 ):
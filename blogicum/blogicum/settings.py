@@ -32,6 +32,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.QueryGuardMiddleware',
+    'core.middleware.PoolTimingMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -70,6 +73,55 @@ DATABASES = {
     }
 }
 
+# Пул соединений: ключ POOL читает только ENGINE
+# 'core.backends.sqlite3_pool', см. core.backends.sqlite3_pool.
+# DATABASES['default'].update({
+#     'ENGINE': 'core.backends.sqlite3_pool',
+#     'POOL': {
+#         'MAX_SIZE': 10,
+#         'TIMEOUT': 10,
+#     },
+# })
+
+# Кэш страниц, версии их зависимостей и счётчики записей должны быть
+# общими для всех процессов: веб-процессы и run_worker сбрасывают
+# их друг у друга. Файловый кэш разделяется процессами одного сервера;
+# для нескольких серверов укажите Redis или Memcached. Кэш в памяти
+# процесса (LocMemCache) отклоняется проверкой blog.W001.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
+# Реплики только для чтения: псевдонимы из DATABASES. Данные на реплики
+# копирует команда sync_replicas. Для проверки на двух файлах SQLite:
+# DATABASES['replica'] = {
+#     'ENGINE': 'django.db.backends.sqlite3',
+#     'NAME': BASE_DIR / 'db_replica.sqlite3',
+#     'TEST': {'MIRROR': 'default'},
+# }
+# DATABASE_REPLICAS = ['replica']
+DATABASE_REPLICAS = []
+
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+
+# PRAGMA, которые выполняются при каждом подключении к SQLite, см. core.sqlite.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    # Ожидание блокировки записи, в миллисекундах.
+    'busy_timeout': 5000,
+    'mmap_size': 128 * 1024 * 1024,
+    # Отрицательное значение — размер кэша страниц в КиБ.
+    'cache_size': -16000,
+    'temp_store': 'MEMORY',
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -113,6 +165,30 @@ LOGIN_URL = '/auth/login/'
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма ставятся в очередь и отправляются командой send_queued_mail
+# через бэкенд QUEUED_EMAIL_BACKEND.
+EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+
+QUEUED_EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
+
+# Подсчёт SQL-запросов core.middleware.QueryGuardMiddleware: разбирает
+# каждый запрос к базе, поэтому в рабочем режиме отключён.
+QUERY_GUARD = DEBUG
+
+QUERY_GUARD_THRESHOLD = 3
+
+QUERY_GUARD_HEADERS = DEBUG
+
+POOL_TIMING_HEADERS = DEBUG
+
+# Асинхронные представления чтения blog.async_views для запуска через ASGI.
+BLOG_ASYNC_VIEWS = False
+
+# Путь к классу бэкенда поиска; по умолчанию выбирается по СУБД,
+# см. blog.search.
+BLOG_SEARCH_BACKEND = None
+
+# Выполнять фоновые задачи сразу, без очереди и команды run_worker.
+JOBS_EAGER = False
@@ -0,0 +1,46 @@
+"""Бэкенд SQLite с пулом соединений.
+
+Подключается в DATABASES как ENGINE 'core.backends.sqlite3_pool'.
+Соединение, которое Django закрывает в конце запроса, возвращается
+в пул, а следующий запрос получает его без повторного открытия файла
+и регистрации функций. Параметры пула задаются ключом POOL:
+{'MAX_SIZE': ..., 'TIMEOUT': ..., 'CHECK_AFTER': ...}.
+База в памяти работает без пула: закрытие соединения её уничтожает.
+"""
+from django.db.backends.sqlite3 import base
+
+from core.constants import POOL_CHECK_AFTER, POOL_MAX_SIZE, POOL_TIMEOUT
+from core.pool import get_pool, record_pool_wait
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    pool = None
+
+    def get_new_connection(self, conn_params):
+        if self.is_in_memory_db():
+            return super().get_new_connection(conn_params)
+        options = self.settings_dict.get('POOL') or {}
+        self.pool = get_pool(
+            (self.alias, str(self.settings_dict['NAME'])),
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params
+            ),
+            max_size=options.get('MAX_SIZE', POOL_MAX_SIZE),
+            timeout=options.get('TIMEOUT', POOL_TIMEOUT),
+            check_after=options.get('CHECK_AFTER', POOL_CHECK_AFTER),
+        )
+        connection, waited = self.pool.checkout()
+        record_pool_wait(waited)
+        return connection
+
+    def _close(self):
+        if self.pool is None or self.connection is None:
+            return super()._close()
+        connection = self.connection
+        reusable = True
+        if connection.in_transaction:
+            try:
+                connection.rollback()
+            except Exception:
+                reusable = False
+        self.pool.checkin(connection, reusable)
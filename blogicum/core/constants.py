@@ -2,3 +2,29 @@
 
 
 TITLE_DISPLAY_LENGTH = 30
+
+# Очередь фоновых задач: число попыток, задержка перед повтором
+# (удваивается с каждой попыткой) и пауза между опросами очереди.
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 30
+JOB_POLL_INTERVAL = 1
+JOB_NAME_LENGTH = 128
+
+# Очередь писем: размер пачки, число попыток и задержка перед повтором
+# (удваивается с каждой попыткой), через сколько секунд вернуть в очередь
+# пачку остановленного обработчика.
+EMAIL_BATCH_SIZE = 50
+EMAIL_MAX_ATTEMPTS = 5
+EMAIL_RETRY_DELAY = 60
+EMAIL_STALE_AFTER = 600
+
+# Сколько секунд после записи читать с основной базы, а не с реплик,
+# и имя cookie, которое это отмечает.
+REPLICA_PIN_SECONDS = 10
+REPLICA_PIN_COOKIE = 'primary_pin'
+
+# Пул соединений: наибольшее число соединений, сколько секунд ждать
+# свободного и после скольких секунд простоя проверять соединение.
+POOL_MAX_SIZE = 10
+POOL_TIMEOUT = 10
+POOL_CHECK_AFTER = 30
@@ -0,0 +1,110 @@
+"""Очередь фоновых задач, хранящаяся в базе данных.
+
+Задачи регистрируются декоратором task в модулях tasks.py приложений,
+ставятся в очередь функцией enqueue() и выполняются командой run_worker.
+"""
+import logging
+import traceback
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .constants import JOB_MAX_ATTEMPTS, JOB_RETRY_DELAY
+from .models import Job
+
+logger = logging.getLogger('core.jobs')
+
+registry: Dict[str, Callable[..., None]] = {}
+
+
+def task(name: str):
+    """Регистрирует функцию как фоновую задачу с именем name."""
+    def decorator(func):
+        registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(task_name: str, **payload) -> Optional[Job]:
+    """Ставит задачу в очередь.
+
+    Параметры задачи должны сериализоваться в JSON. При настройке
+    JOBS_EAGER задача выполняется сразу и None возвращается вместо Job.
+    """
+    if task_name not in registry:
+        raise ValueError(f'Неизвестная задача: {task_name}')
+    if getattr(settings, 'JOBS_EAGER', False):
+        registry[task_name](**payload)
+        return None
+    return Job.objects.create(name=task_name, payload=payload)
+
+
+def claim_job() -> Optional[Job]:
+    """Забирает из очереди ближайшую готовую к выполнению задачу.
+
+    Задача переводится в состояние RUNNING условным UPDATE, поэтому
+    несколько обработчиков не возьмут одну и ту же задачу.
+    """
+    now = timezone.now()
+    candidates = Job.objects.filter(
+        status=Job.PENDING, run_after__lte=now
+    ).order_by('run_after', 'id').values_list('pk', flat=True)[:10]
+    for pk in candidates:
+        if Job.objects.filter(pk=pk, status=Job.PENDING).update(
+                status=Job.RUNNING,
+                started_at=now,
+                attempts=F('attempts') + 1
+        ):
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job: Job) -> bool:
+    """Выполняет задачу и записывает результат.
+
+    При ошибке задача возвращается в очередь с задержкой, которая
+    удваивается с каждой попыткой; после JOB_MAX_ATTEMPTS попыток
+    задача помечается как FAILED.
+    """
+    try:
+        func = registry.get(job.name)
+        if func is None:
+            raise LookupError(f'Неизвестная задача: {job.name}')
+        with transaction.atomic():
+            func(**job.payload)
+    except Exception:
+        logger.exception('Ошибка задачи %s', job)
+        job.last_error = traceback.format_exc()
+        if job.attempts >= JOB_MAX_ATTEMPTS:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+        else:
+            job.status = Job.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            )
+        job.save(update_fields=(
+            'status', 'run_after', 'finished_at', 'last_error'
+        ))
+        return False
+    job.status = Job.DONE
+    job.finished_at = timezone.now()
+    job.last_error = ''
+    job.save(update_fields=('status', 'finished_at', 'last_error'))
+    return True
+
+
+def requeue_stale_jobs(timeout: int) -> int:
+    """Возвращает в очередь задачи, зависшие в RUNNING дольше timeout.
+
+    Так задачи обработчика, остановленного во время работы, выполняются
+    заново.
+    """
+    return Job.objects.filter(
+        status=Job.RUNNING,
+        started_at__lt=timezone.now() - timedelta(seconds=timeout)
+    ).update(status=Job.PENDING, run_after=timezone.now())
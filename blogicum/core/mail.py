@@ -0,0 +1,177 @@
+"""Отправка писем через очередь в базе данных.
+
+QueuedEmailBackend только сохраняет письма в core.QueuedEmail, поэтому
+запрос, отправляющий письмо (например, сброс пароля), не ждёт почтовый
+сервер. Команда send_queued_mail отправляет письма пачками через одно
+соединение бэкенда из настройки QUEUED_EMAIL_BACKEND.
+"""
+import logging
+import time
+from datetime import timedelta
+from email import message_from_bytes
+from email.message import Message
+from typing import List, NamedTuple
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.mail import EmailMessage
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import MIMEMixin
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .constants import EMAIL_MAX_ATTEMPTS, EMAIL_RETRY_DELAY, EMAIL_STALE_AFTER
+from .models import QueuedEmail
+
+logger = logging.getLogger('core.mail')
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Бэкенд, который ставит письма в очередь вместо отправки."""
+
+    def send_messages(self, email_messages):
+        emails = [
+            QueuedEmail(
+                from_email=email_message.from_email,
+                recipients=email_message.recipients(),
+                message=email_message.message().as_bytes(),
+            )
+            for email_message in email_messages
+            if email_message.recipients()
+        ]
+        try:
+            QueuedEmail.objects.bulk_create(emails)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+        return len(emails)
+
+
+class _StoredMIMEMessage(MIMEMixin, Message):
+    """Разобранное письмо с as_bytes(linesep=...), как ждут бэкенды."""
+
+
+class StoredEmailMessage(EmailMessage):
+    """Письмо из очереди, передаваемое бэкенду отправки без изменений."""
+
+    def __init__(self, email: QueuedEmail):
+        super().__init__(from_email=email.from_email)
+        self.stored_recipients = email.recipients
+        self.raw_message = bytes(email.message)
+
+    def recipients(self):
+        return self.stored_recipients
+
+    def message(self):
+        return message_from_bytes(
+            self.raw_message, _class=_StoredMIMEMessage
+        )
+
+
+class FlushStats(NamedTuple):
+    """Итоги отправки пачки писем."""
+
+    sent: int
+    failed: int
+    seconds: float
+
+    @property
+    def rate(self) -> float:
+        """Число отправленных писем в секунду."""
+        return self.sent / self.seconds if self.seconds else 0.0
+
+
+def claim_batch(size: int) -> List[QueuedEmail]:
+    """Забирает из очереди пачку писем, готовых к отправке.
+
+    Пачка помечается уникальным идентификатором условным UPDATE, поэтому
+    несколько обработчиков не отправят одно письмо дважды. Письма пачки
+    остановленного обработчика через EMAIL_STALE_AFTER секунд
+    забираются заново.
+    """
+    now = timezone.now()
+    ready = Q(status=QueuedEmail.PENDING, send_after__lte=now) | Q(
+        status=QueuedEmail.SENDING,
+        claimed_at__lt=now - timedelta(seconds=EMAIL_STALE_AFTER)
+    )
+    ids = list(
+        QueuedEmail.objects.filter(ready)
+        .order_by('send_after', 'id')
+        .values_list('pk', flat=True)[:size]
+    )
+    if not ids:
+        return []
+    batch = uuid4()
+    QueuedEmail.objects.filter(ready, pk__in=ids).update(
+        status=QueuedEmail.SENDING,
+        batch=batch,
+        claimed_at=now,
+        attempts=F('attempts') + 1
+    )
+    return list(QueuedEmail.objects.filter(batch=batch).order_by('id'))
+
+
+def _retry_later(email: QueuedEmail, error: Exception):
+    email.last_error = f'{type(error).__name__}: {error}'
+    email.batch = None
+    if email.attempts >= EMAIL_MAX_ATTEMPTS:
+        email.status = QueuedEmail.FAILED
+    else:
+        email.status = QueuedEmail.PENDING
+        email.send_after = timezone.now() + timedelta(
+            seconds=EMAIL_RETRY_DELAY * 2 ** (email.attempts - 1)
+        )
+    email.save(update_fields=('status', 'send_after', 'batch', 'last_error'))
+
+
+def _reconnect(connection):
+    try:
+        connection.close()
+        connection.open()
+    except Exception:
+        logger.warning('Не удалось переподключиться', exc_info=True)
+
+
+def flush_batch(connection, size: int) -> FlushStats:
+    """Отправляет пачку писем через открытое соединение connection.
+
+    Письмо с ошибкой возвращается в очередь с задержкой, которая
+    удваивается с каждой попыткой, а после EMAIL_MAX_ATTEMPTS попыток
+    помечается как FAILED. После ошибки соединение открывается заново.
+    """
+    started = time.monotonic()
+    sent_ids = []
+    failed = 0
+    for email in claim_batch(size):
+        try:
+            connection.send_messages([StoredEmailMessage(email)])
+        except Exception as error:
+            logger.warning('Письмо %s не отправлено: %s', email, error)
+            _retry_later(email, error)
+            failed += 1
+            _reconnect(connection)
+        else:
+            sent_ids.append(email.pk)
+    QueuedEmail.objects.filter(pk__in=sent_ids).update(
+        status=QueuedEmail.SENT,
+        sent_at=timezone.now(),
+        batch=None,
+        last_error=''
+    )
+    stats = FlushStats(len(sent_ids), failed, time.monotonic() - started)
+    if stats.sent or stats.failed:
+        logger.info(
+            'Отправлено писем: %d, с ошибкой: %d за %.3f с (%.1f в секунду)',
+            stats.sent, stats.failed, stats.seconds, stats.rate
+        )
+    return stats
+
+
+def get_delivery_backend_path() -> str:
+    """Возвращает путь к бэкенду, который реально отправляет письма."""
+    return getattr(
+        settings,
+        'QUEUED_EMAIL_BACKEND',
+        'django.core.mail.backends.smtp.EmailBackend'
+    )
@@ -0,0 +1,143 @@
+"""Замер чтения SQLite при одновременной записи комментариев."""
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from functools import partial
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from core.sqlite import apply_pragmas, get_pragmas
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+FEED_SQL = (
+    'SELECT id, title, pub_date, comment_count FROM blog_post '
+    'WHERE is_published AND pub_date <= ? '
+    'ORDER BY pub_date DESC, id DESC LIMIT 10'
+)
+INSERT_COMMENT_SQL = (
+    'INSERT INTO blog_comment '
+    '(text, post_id, author_id, created_at, is_published) '
+    'VALUES (?, ?, ?, ?, 1)'
+)
+UPDATE_POST_SQL = (
+    'UPDATE blog_post SET comment_count = comment_count + 1, '
+    'updated_at = ? WHERE id = ?'
+)
+
+
+def _now():
+    # Формат, в котором Django хранит даты в SQLite.
+    return timezone.now().strftime(DATETIME_FORMAT)
+
+
+def _read(db):
+    try:
+        db.execute(FEED_SQL, (_now(),)).fetchall()
+    except sqlite3.OperationalError:
+        return 'locked'
+    return 'reads'
+
+
+def _write(db, row):
+    post_id, author_id = row
+    now = _now()
+    try:
+        db.execute('BEGIN')
+        db.execute(INSERT_COMMENT_SQL, ('Замер', post_id, author_id, now))
+        db.execute(UPDATE_POST_SQL, (now, post_id))
+        db.execute('COMMIT')
+    except sqlite3.OperationalError:
+        if db.in_transaction:
+            db.execute('ROLLBACK')
+        return 'locked'
+    return 'writes'
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite во временный файл и сравнивает '
+        'исходные настройки с SQLITE_PRAGMAS: читатели выбирают ленту, '
+        'писатели одновременно добавляют комментарии.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seconds', type=float, default=5,
+            help='Длительность замера каждого профиля.',
+        )
+        parser.add_argument(
+            '--readers', type=int, default=4,
+            help='Число потоков чтения.',
+        )
+        parser.add_argument(
+            '--writers', type=int, default=2,
+            help='Число потоков записи.',
+        )
+
+    def handle(self, *args, **options):
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('Команда замеряет только базы SQLite.')
+        source.ensure_connection()
+        row = source.connection.execute(
+            'SELECT id, author_id FROM blog_post LIMIT 1'
+        ).fetchone()
+        if row is None:
+            raise CommandError('В базе нет записей для комментариев.')
+        profiles = (
+            ('исходный', {'journal_mode': 'DELETE'}),
+            ('SQLITE_PRAGMAS', get_pragmas()),
+        )
+        self.stdout.write(
+            f'{"профиль":>15} {"чтений/с":>10} {"записей/с":>10} '
+            f'{"блокировок":>11}'
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for number, (name, pragmas) in enumerate(profiles):
+                path = Path(directory) / f'{number}.sqlite3'
+                target = sqlite3.connect(path)
+                source.connection.backup(target)
+                target.close()
+                reads, writes, locked = self._measure(
+                    path, pragmas, row, options
+                )
+                seconds = options['seconds']
+                self.stdout.write(
+                    f'{name:>15} {reads / seconds:>10.1f} '
+                    f'{writes / seconds:>10.1f} {locked:>11}'
+                )
+
+    def _measure(self, path, pragmas, row, options):
+        stop = threading.Event()
+        counters = Counter()
+        lock = threading.Lock()
+
+        def run(work):
+            # Как в Django: автокоммит и ожидание блокировки 5 секунд.
+            db = sqlite3.connect(path, timeout=5, isolation_level=None)
+            apply_pragmas(db, pragmas)
+            while not stop.is_set():
+                result = work(db)
+                with lock:
+                    counters[result] += 1
+            db.close()
+
+        threads = [
+            threading.Thread(target=run, args=(_read,))
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(target=run, args=(partial(_write, row=row),))
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(options['seconds'])
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return counters['reads'], counters['writes'], counters['locked']
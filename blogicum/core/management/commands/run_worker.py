@@ -0,0 +1,55 @@
+"""Команда обработчика очереди фоновых задач."""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.constants import JOB_POLL_INTERVAL
+from core.jobs import claim_job, requeue_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди core.Job.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить готовые задачи и завершиться.',
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            default=0,
+            help='Завершиться после стольких задач; 0 — без ограничения.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=JOB_POLL_INTERVAL,
+            help='Пауза между опросами пустой очереди, в секундах.',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=int,
+            default=600,
+            help='Через сколько секунд вернуть в очередь зависшую задачу.',
+        )
+
+    def handle(self, *args, **options):
+        done = failed = 0
+        requeue_stale_jobs(options['stale_after'])
+        while not options['max_jobs'] or done + failed < options['max_jobs']:
+            job = claim_job()
+            if job is None:
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                requeue_stale_jobs(options['stale_after'])
+                continue
+            if run_job(job):
+                done += 1
+            else:
+                failed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {done}, с ошибкой: {failed}'
+        ))
@@ -0,0 +1,57 @@
+"""Команда отправки писем из очереди core.QueuedEmail."""
+import time
+
+from django.core.mail import get_connection
+from django.core.management.base import BaseCommand
+
+from core.constants import EMAIL_BATCH_SIZE, JOB_POLL_INTERVAL
+from core.mail import flush_batch, get_delivery_backend_path
+
+
+class Command(BaseCommand):
+    help = (
+        'Отправляет письма из очереди пачками через одно соединение '
+        'бэкенда QUEUED_EMAIL_BACKEND.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить готовые письма и завершиться.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=EMAIL_BATCH_SIZE,
+            help='Сколько писем отправлять за одну пачку.',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=JOB_POLL_INTERVAL,
+            help='Пауза между опросами пустой очереди, в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        sent = failed = 0
+        seconds = 0.0
+        connection = get_connection(get_delivery_backend_path())
+        connection.open()
+        try:
+            while True:
+                stats = flush_batch(connection, options['batch_size'])
+                sent += stats.sent
+                failed += stats.failed
+                seconds += stats.seconds
+                if stats.sent + stats.failed < options['batch_size']:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+        finally:
+            connection.close()
+        rate = sent / seconds if seconds else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f'Отправлено писем: {sent}, с ошибкой: {failed}, '
+            f'{rate:.1f} в секунду'
+        ))
@@ -0,0 +1,60 @@
+"""Команда копирования основной базы SQLite на реплики."""
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.replicas import get_replica_aliases
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite в файлы реплик из '
+        'DATABASE_REPLICAS через backup API. Заменяет репликацию '
+        'при локальной проверке чтения с реплик.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases',
+            nargs='*',
+            help='Псевдонимы реплик; по умолчанию все из DATABASE_REPLICAS.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Повторять копирование с такой паузой, в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or get_replica_aliases()
+        if not aliases:
+            raise CommandError('Реплики не настроены: DATABASE_REPLICAS.')
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError('Команда копирует только базы SQLite.')
+        targets = []
+        for alias in aliases:
+            database = settings.DATABASES.get(alias)
+            if database is None or 'sqlite3' not in database['ENGINE']:
+                raise CommandError(f'{alias}: ожидается реплика SQLite.')
+            targets.append((alias, str(database['NAME'])))
+        while True:
+            source.ensure_connection()
+            for alias, name in targets:
+                started = time.monotonic()
+                target = sqlite3.connect(name)
+                try:
+                    source.connection.backup(target)
+                finally:
+                    target.close()
+                self.stdout.write(
+                    f'{alias}: скопировано за '
+                    f'{time.monotonic() - started:.3f} с'
+                )
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,161 @@
+"""Промежуточные слои корневого приложения core."""
+import asyncio
+import logging
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .constants import REPLICA_PIN_COOKIE, REPLICA_PIN_SECONDS
+from .pool import all_pools, track_pool_waits
+from .queries import QueryCounter
+from .replicas import get_replica_aliases, replica_reads
+
+logger = logging.getLogger('core.queries')
+
+
+class QueryGuardMiddleware:
+    """Считает SQL-запросы каждого HTTP-запроса и сообщает о N+1.
+
+    Повторяющиеся запросы пишутся в журнал core.queries. Если включена
+    настройка QUERY_GUARD_HEADERS, число запросов и отпечатки повторов
+    добавляются в заголовки X-Query-Count и X-N-Plus-One.
+
+    Слой работает, только если включена настройка QUERY_GUARD
+    (по умолчанию равна DEBUG): отпечаток каждого запроса стоит времени.
+
+    Под ASGI с асинхронными представлениями запросы к базе выполняются
+    в потоках sync_to_async, где счётчик не установлен, поэтому слой
+    пропускает такие запросы без подсчёта, не занимая поток.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_GUARD', settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'QUERY_GUARD_THRESHOLD', 3)
+        self.headers = getattr(settings, 'QUERY_GUARD_HEADERS', False)
+        if asyncio.iscoroutinefunction(get_response):
+            # Признак, по которому Django считает слой асинхронным.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        counter = QueryCounter(self.threshold)
+        with counter:
+            response = self.get_response(request)
+        repeated = counter.repeated
+        for sql, times in repeated.items():
+            logger.warning(
+                'N+1: %s %s: запрос выполнен %d раз: %s',
+                request.method, request.path, times, sql
+            )
+        if self.headers:
+            response['X-Query-Count'] = counter.count
+            if repeated:
+                response['X-N-Plus-One'] = ', '.join(
+                    counter.repeated_digests()
+                )
+        return response
+
+
+class ReplicaPinningMiddleware:
+    """Включает чтение с реплик для запросов, не изменяющих данные.
+
+    Запросы с небезопасными методами и запросы посетителя, недавно
+    изменявшего данные (cookie REPLICA_PIN_COOKIE), читают с основной
+    базы. Если запрос что-то записал, посетитель получает эту cookie
+    на REPLICA_PIN_SECONDS секунд.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def _allowed(self, request):
+        return (
+            request.method in ('GET', 'HEAD', 'OPTIONS')
+            and REPLICA_PIN_COOKIE not in request.COOKIES
+        )
+
+    def _pin(self, state, response):
+        if state.wrote and get_replica_aliases():
+            response.set_cookie(
+                REPLICA_PIN_COOKIE,
+                '1',
+                max_age=REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        with replica_reads(self._allowed(request)) as state:
+            response = self.get_response(request)
+        return self._pin(state, response)
+
+    async def __acall__(self, request):
+        with replica_reads(self._allowed(request)) as state:
+            response = await self.get_response(request)
+        return self._pin(state, response)
+
+
+class PoolTimingMiddleware:
+    """Сообщает в заголовке Server-Timing о пуле соединений с базой.
+
+    pool-wait — сколько запрос ждал свободного соединения, pool-use —
+    сколько соединений занято из наибольшего числа. Заголовок
+    добавляется при включённой настройке POOL_TIMING_HEADERS, если
+    используется бэкенд с пулом.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.headers = getattr(settings, 'POOL_TIMING_HEADERS', False)
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def _patch(self, response, waits):
+        pools = all_pools()
+        if not (self.headers and pools):
+            return response
+        in_use = max_size = 0
+        for pool in pools.values():
+            stats = pool.stats()
+            in_use += stats.in_use
+            max_size += stats.max_size
+        metrics = [
+            f'pool-wait;dur={sum(waits) * 1000:.3f}',
+            f'pool-use;desc="{in_use}/{max_size}"',
+        ]
+        if response.has_header('Server-Timing'):
+            metrics.insert(0, response['Server-Timing'])
+        response['Server-Timing'] = ', '.join(metrics)
+        return response
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        with track_pool_waits() as waits:
+            response = self.get_response(request)
+        return self._patch(response, waits)
+
+    async def __acall__(self, request):
+        with track_pool_waits() as waits:
+            response = await self.get_response(request)
+        return self._patch(response, waits)
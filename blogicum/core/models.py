@@ -1,6 +1,7 @@
 from django.db import models
+from django.utils import timezone
 
-from .constants import TITLE_DISPLAY_LENGTH
+from .constants import JOB_NAME_LENGTH, TITLE_DISPLAY_LENGTH
 
 
 class CreatedPublishedModel(models.Model):
@@ -29,3 +30,95 @@ class TitleModel(CreatedPublishedModel):
 
     def __str__(self):
         return self.title[:TITLE_DISPLAY_LENGTH]
+
+
+class Job(models.Model):
+    """Фоновая задача, которую выполняет команда run_worker."""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=JOB_NAME_LENGTH)
+    payload = models.JSONField('Параметры', default=dict)
+    status = models.CharField(
+        'Состояние',
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    run_after = models.DateTimeField('Выполнить после', default=timezone.now)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    started_at = models.DateTimeField('Начато', null=True, blank=True)
+    finished_at = models.DateTimeField('Завершено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ('run_after', 'id')
+        indexes = (
+            models.Index(
+                fields=('run_after', 'id'),
+                condition=models.Q(status='pending'),
+                name='job_pending_run_after_idx',
+            ),
+        )
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
+
+
+class QueuedEmail(models.Model):
+    """Письмо, ожидающее отправки командой send_queued_mail."""
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (SENDING, 'Отправляется'),
+        (SENT, 'Отправлено'),
+        (FAILED, 'Ошибка'),
+    )
+
+    from_email = models.CharField('Отправитель', max_length=254)
+    recipients = models.JSONField('Получатели', default=list)
+    message = models.BinaryField('Письмо')
+    status = models.CharField(
+        'Состояние',
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    send_after = models.DateTimeField('Отправить после', default=timezone.now)
+    batch = models.UUIDField('Пачка', null=True, blank=True)
+    created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    claimed_at = models.DateTimeField('Взято', null=True, blank=True)
+    sent_at = models.DateTimeField('Отправлено', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ('send_after', 'id')
+        indexes = (
+            models.Index(
+                fields=('send_after', 'id'),
+                condition=models.Q(status='pending'),
+                name='email_pending_send_after_idx',
+            ),
+        )
+        verbose_name = 'письмо'
+        verbose_name_plural = 'Очередь писем'
+
+    def __str__(self):
+        return f'{", ".join(self.recipients)} #{self.pk} ({self.status})'
@@ -0,0 +1,185 @@
+"""Пул соединений с базой данных.
+
+Пул потокобезопасен: соединения Django привязаны к потоку (под ASGI —
+к потоку sync_to_async), и каждый поток берёт из пула своё соединение.
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from django.db import OperationalError
+
+from .constants import POOL_CHECK_AFTER, POOL_MAX_SIZE, POOL_TIMEOUT
+
+
+class PoolStats(NamedTuple):
+    """Состояние пула для заголовка Server-Timing и журналов."""
+
+    size: int
+    in_use: int
+    max_size: int
+    checkouts: int
+    waits: int
+    wait_seconds: float
+
+    @property
+    def utilization(self) -> float:
+        """Доля занятых соединений от наибольшего размера пула."""
+        return self.in_use / self.max_size
+
+
+class ConnectionPool:
+    """Пул DB-API соединений не больше max_size штук.
+
+    Соединение, простоявшее в пуле дольше check_after секунд, перед
+    выдачей проверяется запросом SELECT 1 и при ошибке заменяется новым.
+    Если все соединения заняты, checkout() ждёт не дольше timeout секунд.
+    """
+
+    def __init__(
+            self,
+            connect: Callable[[], Any],
+            max_size: int = POOL_MAX_SIZE,
+            timeout: float = POOL_TIMEOUT,
+            check_after: float = POOL_CHECK_AFTER
+    ):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.check_after = check_after
+        self._idle = deque()
+        self._size = 0
+        self._condition = threading.Condition()
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+
+    def checkout(self):
+        """Выдаёт соединение и время ожидания свободного, в секундах."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        with self._condition:
+            while not self._idle and self._size >= self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise OperationalError(
+                        f'Нет свободных соединений в пуле за {self.timeout} с'
+                    )
+            if self._idle:
+                connection, released = self._idle.pop()
+            else:
+                connection, released = None, None
+                self._size += 1
+            waited = time.monotonic() - started
+            self._checkouts += 1
+            if waited > 0.001:
+                self._waits += 1
+            self._wait_seconds += waited
+        if connection is not None and not self._is_healthy(
+                connection, released
+        ):
+            self._discard(connection, keep_slot=True)
+            connection = None
+        if connection is None:
+            try:
+                connection = self.connect()
+            except Exception:
+                self._release_slot()
+                raise
+        return connection, waited
+
+    def checkin(self, connection, reusable: bool = True):
+        """Возвращает соединение в пул или закрывает его."""
+        if not reusable:
+            self._discard(connection)
+            return
+        with self._condition:
+            self._idle.append((connection, time.monotonic()))
+            self._condition.notify()
+
+    def close(self):
+        """Закрывает все свободные соединения."""
+        with self._condition:
+            idle, self._idle = self._idle, deque()
+            self._size -= len(idle)
+            self._condition.notify_all()
+        for connection, _ in idle:
+            connection.close()
+
+    def stats(self) -> PoolStats:
+        with self._condition:
+            return PoolStats(
+                self._size,
+                self._size - len(self._idle),
+                self.max_size,
+                self._checkouts,
+                self._waits,
+                self._wait_seconds,
+            )
+
+    def _is_healthy(self, connection, released: float) -> bool:
+        if time.monotonic() - released < self.check_after:
+            return True
+        try:
+            connection.execute('SELECT 1').fetchone()
+        except Exception:
+            return False
+        return True
+
+    def _discard(self, connection, keep_slot: bool = False):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        if not keep_slot:
+            self._release_slot()
+
+    def _release_slot(self):
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
+
+
+_request_waits: ContextVar[Optional[List[float]]] = ContextVar(
+    'pool_waits', default=None
+)
+
+
+@contextmanager
+def track_pool_waits():
+    """Собирает время ожидания пула внутри блока.
+
+    Учитываются и потоки sync_to_async: asgiref передаёт им контекст.
+    """
+    waits = []
+    token = _request_waits.set(waits)
+    try:
+        yield waits
+    finally:
+        _request_waits.reset(token)
+
+
+def record_pool_wait(seconds: float):
+    waits = _request_waits.get()
+    if waits is not None:
+        waits.append(seconds)
+
+
+_pools: Dict[Any, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key, connect: Callable[[], Any], **options) -> ConnectionPool:
+    """Возвращает общий пул для ключа key, создавая его при первом вызове."""
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(connect, **options)
+        return _pools[key]
+
+
+def all_pools() -> Dict[Any, ConnectionPool]:
+    with _pools_lock:
+        return dict(_pools)
@@ -0,0 +1,68 @@
+"""Подсчёт SQL-запросов и поиск повторяющихся запросов (N+1)."""
+import re
+from collections import Counter
+from contextlib import ContextDecorator, ExitStack
+from hashlib import md5
+from typing import Dict, List
+
+from django.db import connections
+
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_SPACES = re.compile(r'\s+')
+
+
+def fingerprint(sql: str) -> str:
+    """Возвращает «форму» запроса без параметров.
+
+    Параметры запроса и так переданы отдельно от SQL; списки IN (%s, …)
+    разной длины сводятся к одному виду.
+    """
+    sql = _IN_LIST.sub('(%s...)', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+class QueryCounter(ContextDecorator):
+    """Считает SQL-запросы ко всем базам данных внутри блока with.
+
+    Можно использовать и как декоратор. Одинаковые по форме запросы,
+    повторённые не меньше threshold раз, считаются признаком N+1.
+    """
+
+    def __init__(self, threshold: int = 3):
+        self.threshold = threshold
+        self.fingerprints: Counter = Counter()
+        self._stack = None
+
+    def _execute(self, execute, sql, params, many, context):
+        self.fingerprints[fingerprint(sql)] += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self.fingerprints.clear()
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(
+                connection.execute_wrapper(self._execute)
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    @property
+    def count(self) -> int:
+        return sum(self.fingerprints.values())
+
+    @property
+    def repeated(self) -> Dict[str, int]:
+        """Запросы, повторённые threshold и более раз: форма -> число."""
+        return {
+            sql: times for sql, times in self.fingerprints.items()
+            if times >= self.threshold
+        }
+
+    def repeated_digests(self) -> List[str]:
+        """Короткие отпечатки повторяющихся запросов для заголовков."""
+        return [
+            md5(sql.encode()).hexdigest()[:12] for sql in self.repeated
+        ]
@@ -0,0 +1,78 @@
+"""Чтение с реплик базы данных.
+
+ReplicaRouter отправляет чтение на реплики из настройки DATABASE_REPLICAS
+только внутри replica_reads(): его включает ReplicaPinningMiddleware для
+безопасных HTTP-запросов. Команды, фоновые задачи и запросы, изменяющие
+данные, читают с основной базы. После записи чтение в том же запросе
+и ещё REPLICA_PIN_SECONDS секунд у того же посетителя идёт на основную
+базу, чтобы он видел свои изменения.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+class ReplicaReads:
+    """Состояние чтения с реплик в рамках одного HTTP-запроса."""
+
+    def __init__(self, allowed: bool = True):
+        self.allowed = allowed
+        self.wrote = False
+
+
+_state: ContextVar[Optional[ReplicaReads]] = ContextVar(
+    'replica_reads', default=None
+)
+
+
+@contextmanager
+def replica_reads(allowed: bool = True):
+    """Разрешает чтение с реплик внутри блока, пока не было записи."""
+    state = ReplicaReads(allowed)
+    token = _state.set(state)
+    try:
+        yield state
+    finally:
+        _state.reset(token)
+
+
+def get_replica_aliases() -> List[str]:
+    """Возвращает псевдонимы реплик из настройки DATABASE_REPLICAS."""
+    return list(getattr(settings, 'DATABASE_REPLICAS', ()))
+
+
+class ReplicaRouter:
+    """Маршрутизатор: запись — в основную базу, чтение — на реплики."""
+
+    def db_for_read(self, model, **hints):
+        replicas = get_replica_aliases()
+        if not replicas:
+            return None
+        state = _state.get()
+        if state is None or not state.allowed:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.allowed = False
+            state.wrote = True
+        # Явно: иначе объект, прочитанный с реплики, сохранился бы туда же.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *get_replica_aliases()}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема и данные попадают на реплики командой sync_replicas.
+        if db in get_replica_aliases():
+            return False
+        return None
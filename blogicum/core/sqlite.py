@@ -0,0 +1,41 @@
+"""Настройка соединений SQLite.
+
+При каждом подключении к SQLite выполняются PRAGMA из настройки
+SQLITE_PRAGMAS: журнал WAL, чтобы читатели не ждали писателей,
+synchronous=NORMAL, отображение файла в память, размер кэша страниц
+и время ожидания блокировки вместо немедленной ошибки
+«database is locked».
+"""
+import re
+from typing import Any, Dict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+PRAGMA_NAME = re.compile(r'^[a-z_]+$')
+PRAGMA_VALUE = re.compile(r'^-?\w+$')
+
+
+def get_pragmas() -> Dict[str, Any]:
+    """Возвращает PRAGMA из настройки SQLITE_PRAGMAS."""
+    return dict(getattr(settings, 'SQLITE_PRAGMAS', None) or {})
+
+
+def apply_pragmas(connection, pragmas: Dict[str, Any]):
+    """Выполняет PRAGMA на соединении sqlite3.
+
+    Имена и значения подставляются в текст запроса, поэтому допускаются
+    только слова и целые числа.
+    """
+    for name, value in pragmas.items():
+        if not (PRAGMA_NAME.match(name) and PRAGMA_VALUE.match(str(value))):
+            raise ImproperlyConfigured(
+                f'Недопустимая настройка SQLITE_PRAGMAS: {name}={value!r}'
+            )
+        connection.execute(f'PRAGMA {name} = {value}')
+
+
+def configure_connection(sender, connection, **kwargs):
+    """Обработчик connection_created: настраивает новое соединение."""
+    if connection.vendor == 'sqlite':
+        apply_pragmas(connection.connection, get_pragmas())
@@ -0,0 +1,168 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.constants import POST_INLINE_LIMIT
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("model", ["category", "location"])
+def test_post_inline_is_capped(admin_client, mixer, user, model):
+    category = mixer.blend("blog.Category", is_published=True)
+    location = mixer.blend("blog.Location", is_published=True)
+    mixer.cycle(POST_INLINE_LIMIT + 5).blend(
+        "blog.Post", author=user, category=category, location=location,
+        image="",
+    )
+    obj = category if model == "category" else location
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(f"/admin/blog/{model}/{obj.pk}/change/")
+    assert response.status_code == 200
+    formset = response.context["inline_admin_formsets"][0].formset
+    assert len(formset.forms) == POST_INLINE_LIMIT, (
+        "Убедитесь, что на странице в админке выводится ограниченное"
+        " число записей."
+    )
+    post_queries = [
+        q["sql"] for q in queries if 'FROM "blog_post"' in q["sql"]
+    ]
+    assert len(post_queries) == 1
+    assert '"blog_post"."text"' not in post_queries[0]
+    assert f"{model}__id__exact={obj.pk}" in response.content.decode()
+
+
+def test_changelist_filters_do_not_list_related_rows(
+        admin_client, mixer, user, published_category, published_location
+):
+    others = mixer.cycle(5).blend("auth.User")
+    mine = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=published_location, image="",
+    )
+    mixer.blend(
+        "blog.Post", author=others[0], category=published_category,
+        image="",
+    )
+
+    response = admin_client.get("/admin/blog/post/", {"author": user.username})
+    assert [post.pk for post in response.context["cl"].result_list] == [
+        mine.pk
+    ]
+    content = response.content.decode()
+    assert not any(other.username in content for other in others), (
+        "Убедитесь, что фильтр по автору не выводит всех пользователей."
+    )
+
+    response = admin_client.get(
+        "/admin/blog/post/", {"location": published_location.name[:3]}
+    )
+    assert [post.pk for post in response.context["cl"].result_list] == [
+        mine.pk
+    ]
+
+
+def test_category_filter_is_cached(admin_client, mixer, published_category):
+    def category_queries():
+        with CaptureQueriesContext(connection) as queries:
+            admin_client.get("/admin/blog/post/")
+        return [
+            q["sql"] for q in queries
+            if q["sql"].startswith('SELECT "blog_category"')
+        ]
+
+    first = category_queries()
+    assert len(category_queries()) == len(first) - 1, (
+        "Убедитесь, что варианты фильтра по категориям кэшируются."
+    )
+
+    new_category = mixer.blend("blog.Category", title="Новая категория")
+    response = admin_client.get("/admin/blog/post/")
+    assert new_category.title in response.content.decode()
+
+
+def test_list_editable_choices_are_shared(
+        admin_client, mixer, user, published_category, published_locations
+):
+    mixer.cycle(30).blend(
+        "blog.Post", author=user, category=published_category,
+        location=mixer.sequence(*published_locations), image="",
+    )
+    admin_client.get("/admin/blog/post/")
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get("/admin/blog/post/")
+    assert len(response.context["cl"].formset.forms) == 30
+    for table in ("blog_location", "blog_category"):
+        choice_queries = [
+            q["sql"] for q in queries
+            if q["sql"].startswith(f'SELECT "{table}"')
+        ]
+        assert len(choice_queries) == 1, (
+            "Убедитесь, что варианты внешних ключей из list_editable"
+            " загружаются один раз за запрос."
+        )
+
+
+@pytest.mark.parametrize("model", ["post", "comment"])
+def test_changelist_count_is_cached(
+        admin_client, mixer, user, post_with_published_location, model
+):
+    mixer.cycle(3).blend(
+        "blog.Comment", post=post_with_published_location, author=user
+    )
+    url = f"/admin/blog/{model}/"
+    admin_client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(url)
+    assert not any("COUNT(" in q["sql"] for q in queries), (
+        "Убедитесь, что число объектов в списке админки берётся из кэша."
+    )
+    assert response.context["cl"].result_count == (
+        1 if model == "post" else 3
+    )
+    assert response.context["cl"].full_result_count is None
+
+
+def test_changelist_count_follows_new_posts(
+        admin_client, mixer, user, post_with_published_location
+):
+    admin_client.get("/admin/blog/post/")
+    mixer.blend(
+        "blog.Post", author=user,
+        category=post_with_published_location.category, image="",
+    )
+    response = admin_client.get("/admin/blog/post/")
+    assert response.context["cl"].result_count == 2
+
+
+def test_location_posts_link_activates_location_filter(
+        admin_client, mixer, user, published_category, published_locations
+):
+    here, elsewhere = published_locations[:2]
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=here, image="",
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        location=elsewhere, image="",
+    )
+    response = admin_client.get(
+        "/admin/blog/post/", {"location__id__exact": here.pk}
+    )
+    assert response.status_code == 200
+    changelist = response.context["cl"]
+    assert [obj.pk for obj in changelist.result_list] == [post.pk]
+    assert changelist.has_active_filters, (
+        "Убедитесь, что ссылка на записи местоположения включает фильтр"
+        " в боковой панели."
+    )
+    content = response.content.decode()
+    assert f'<li class="selected"><a href="#" title="{here.name}">' in content
+    assert 'href="?" title="Сбросить"' in content, (
+        "Убедитесь, что «Сбросить» убирает фильтр по местоположению."
+    )
+    response = admin_client.get(
+        "/admin/blog/post/", {"location__id__exact": "abc"}
+    )
+    assert response.status_code == 302
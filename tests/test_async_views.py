@@ -0,0 +1,94 @@
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_request(rf, settings):
+    def make(path, user=None):
+        request = rf.get(path)
+        request.user = user or AnonymousUser()
+        if user is not None:
+            request.COOKIES[settings.SESSION_COOKIE_NAME] = "session"
+        return request
+
+    cache.clear()
+    return make
+
+
+def test_async_views_render_like_sync_views(
+        make_request, post_with_published_location
+):
+    from blog import async_views, views
+
+    post = post_with_published_location
+    pages = [
+        ("index", "/", ()),
+        ("post_detail", f"/posts/{post.pk}/", (post.pk,)),
+        (
+            "category_posts",
+            f"/category/{post.category.slug}/",
+            (post.category.slug,),
+        ),
+        (
+            "user_profile",
+            f"/profile/{post.author.username}/",
+            (post.author.username,),
+        ),
+    ]
+    for name, path, args in pages:
+        response = async_to_sync(getattr(async_views, name))(
+            make_request(path), *args
+        )
+        assert response.status_code == 200, name
+        assert post.title in response.content.decode(), name
+        cache.clear()
+        expected = getattr(views, name)(make_request(path), *args)
+        assert response.content == expected.content, name
+
+
+def test_async_view_serves_cached_page_without_queries(
+        make_request, post_with_published_location
+):
+    from blog.async_views import index
+
+    first = async_to_sync(index)(make_request("/"))
+    with CaptureQueriesContext(connection) as queries:
+        second = async_to_sync(index)(make_request("/"))
+    assert second.content == first.content
+    assert len(queries) == 0
+
+
+def test_async_view_skips_cache_for_users(
+        make_request, user, post_with_published_location
+):
+    from blog.async_views import index
+
+    async_to_sync(index)(make_request("/"))
+    with CaptureQueriesContext(connection) as queries:
+        response = async_to_sync(index)(make_request("/", user))
+    assert response.status_code == 200
+    assert len(queries) > 0
+
+
+@pytest.mark.parametrize("view_name", ["index", "async_index"])
+def test_cached_page_varies_on_cookie(
+        make_request, post_with_published_location, view_name
+):
+    from blog import async_views, views
+
+    if view_name == "async_index":
+        view = async_to_sync(async_views.index)
+    else:
+        view = views.index
+    view(make_request("/"))
+    response = view(make_request("/"))
+    assert "Cookie" in response.get("Vary", ""), (
+        "Убедитесь, что страница из кэша отдаётся с заголовком"
+        " Vary: Cookie."
+    )
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.cache import get_max_age
+
+from blog.schedule import get_next_publication
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_follows_related_changes(
+        user_client, user, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get("/")
+
+    post.category.title = "Новое название категории"
+    post.category.save()
+    post.location.name = "Новое место"
+    post.location.save()
+    user.username = "renamed_author"
+    user.save()
+
+    content = user_client.get("/").content.decode("utf-8")
+    for expected in ("Новое название категории", "Новое место",
+                     "@renamed_author"):
+        assert expected in content, (
+            "Убедитесь, что кэш карточки поста сбрасывается при изменении"
+            " категории, местоположения и автора."
+        )
+
+
+def test_anonymous_pages_are_cached_and_invalidated(
+        client, user, mixer, CommentModel, post_with_published_location
+):
+    post = post_with_published_location
+    urls = ("/", f"/posts/{post.id}/", f"/category/{post.category.slug}/")
+    for url in urls:
+        assert client.get(url).status_code == 200
+    for url in urls:
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get(url).status_code == 200
+        assert len(queries) == 0, (
+            f"Убедитесь, что страница {url} для анонимного посетителя"
+            " отдаётся из кэша."
+        )
+
+    mixer.blend(CommentModel, post=post, author=user, text="Свежий отзыв")
+    assert "Свежий отзыв" in client.get(urls[1]).content.decode("utf-8")
+    assert "(1)" in client.get(urls[0]).content.decode("utf-8")
+    assert "(1)" in client.get(urls[2]).content.decode("utf-8")
+
+
+def test_authenticated_pages_are_not_cached(
+        user_client, post_with_published_location
+):
+    user_client.get("/")
+    with CaptureQueriesContext(connection) as queries:
+        user_client.get("/")
+    assert len(queries) > 0
+
+
+def test_feed_expires_at_next_publication(
+        client, mixer, user, published_category, another_category,
+        post_with_published_location
+):
+    soon = timezone.now() + timedelta(seconds=90)
+    mixer.blend(
+        "blog.Post", author=user, category=another_category,
+        is_published=True, pub_date=soon
+    )
+    assert get_next_publication() == soon
+    assert get_next_publication(category_id=another_category.pk) == soon
+    assert get_next_publication(category_id=published_category.pk) is None
+
+    assert 0 < get_max_age(client.get("/")) <= 90, (
+        "Убедитесь, что лента перестаёт кэшироваться к моменту ближайшей"
+        " отложенной публикации."
+    )
+    category_response = client.get(f"/category/{published_category.slug}/")
+    assert get_max_age(category_response) > 90
+
+
+def test_process_local_cache_is_reported(settings):
+    from blog.checks import check_shared_cache
+
+    assert check_shared_cache(None) == []
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+    assert [error.id for error in check_shared_cache(None)] == ["blog.W001"]
@@ -0,0 +1,72 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count(post):
+    post.refresh_from_db(fields=["comment_count"])
+    return post.comment_count
+
+
+def test_comment_count_follows_comments(
+        mixer, user, CommentModel, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend(CommentModel, post=post, author=user)
+    assert _count(post) == 3
+
+    # Страница записи выводит все комментарии, и счётчик их все учитывает.
+    comments[0].is_published = False
+    comments[0].save()
+    assert _count(post) == 3
+
+    CommentModel.objects.filter(pk=comments[1].pk).update(is_published=False)
+    assert _count(post) == 3
+
+    CommentModel.objects.bulk_create(
+        [CommentModel(post=post, author=user, text="bulk")] * 1
+    )
+    assert _count(post) == 4
+
+    CommentModel.objects.filter(pk=comments[2].pk).delete()
+    assert _count(post) == 3
+
+
+def test_recount_comments_command(
+        mixer, user, PostModel, CommentModel, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend(CommentModel, post=post, author=user)
+    PostModel.objects.filter(pk=post.pk).update(comment_count=42)
+
+    call_command("recount_comments")
+
+    assert _count(post) == 2
+
+
+def test_single_comment_shifts_count_without_recount(
+        mixer, user, PostModel, CommentModel, post_with_published_location
+):
+    post = post_with_published_location
+    other = mixer.blend(
+        PostModel, author=user, category=post.category, image=""
+    )
+    # Расхождение сохраняется: одиночные изменения не пересчитывают счётчик.
+    PostModel.objects.filter(pk=post.pk).update(comment_count=10)
+    comment = mixer.blend(CommentModel, post=post, author=user)
+    assert _count(post) == 11
+
+    comment = CommentModel.objects.get(pk=comment.pk)
+    comment.is_published = False
+    comment.save()
+    assert _count(post) == 11
+
+    comment.post = other
+    comment.save()
+    assert (_count(post), _count(other)) == (0, 1), (
+        "Убедитесь, что при переносе комментария счётчики пересчитываются."
+    )
+
+    comment.delete()
+    assert _count(other) == 0
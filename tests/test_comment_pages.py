@@ -0,0 +1,52 @@
+import pytest
+
+from blog.constants import NUM_OF_COMMENTS_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_comments(mixer, user, CommentModel, post_with_published_location):
+    return mixer.cycle(NUM_OF_COMMENTS_PER_PAGE * 2 + 5).blend(
+        CommentModel, post=post_with_published_location, author=user
+    )
+
+
+def _comment_ids(response):
+    return [comment.id for comment in response.context["comments"]]
+
+
+def test_comments_are_paginated(
+        user_client, CommentModel, post_with_published_location, many_comments
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    expected = list(
+        CommentModel.objects.filter(post=post_with_published_location)
+        .order_by("created_at", "id").values_list("id", flat=True)
+    )
+    seen = []
+    cursor = ""
+    while cursor is not None:
+        response = user_client.get(url, {"comments": cursor})
+        assert len(response.context["comments"]) <= NUM_OF_COMMENTS_PER_PAGE
+        seen.extend(_comment_ids(response))
+        cursor = response.context["comments"].next_cursor
+    assert seen == expected, (
+        "Убедитесь, что комментарии на странице публикации выводятся"
+        " постранично, от старых к новым, без пропусков и повторов."
+    )
+
+
+def test_comment_anchor_resolves_page(
+        user_client, post_with_published_location, many_comments
+):
+    url = f"/posts/{post_with_published_location.id}/"
+    comment = sorted(
+        many_comments, key=lambda c: (c.created_at, c.id)
+    )[NUM_OF_COMMENTS_PER_PAGE + 3]
+    response = user_client.get(url, {"comment": comment.id})
+    assert response.status_code == 302
+    assert response["Location"].endswith(f"#comment_{comment.id}")
+    response = user_client.get(response["Location"])
+    assert comment.id in _comment_ids(response)
+    assert f'name="comment_{comment.id}"' in response.content.decode()
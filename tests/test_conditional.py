@@ -0,0 +1,90 @@
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+from django.utils.http import http_date
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("client_name", ["client", "user_client"])
+def test_post_detail_conditional_get(
+        request, client_name, mixer, user, CommentModel,
+        post_with_published_location
+):
+    client = request.getfixturevalue(client_name)
+    url = f"/posts/{post_with_published_location.id}/"
+    response = client.get(url)
+    etag = response["ETag"]
+    assert response.has_header("Last-Modified")
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что неизменённая страница публикации отдаётся"
+        " с кодом 304."
+    )
+
+    mixer.blend(CommentModel, post=post_with_published_location, author=user)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response["ETag"] != etag
+
+
+def test_feed_conditional_get(
+        user_client, another_user_client, user, post_with_published_location
+):
+    urls = (
+        "/",
+        f"/category/{post_with_published_location.category.slug}/",
+        f"/profile/{user.username}/",
+    )
+    etags = {}
+    for url in urls:
+        etag = etags[url] = user_client.get(url)["ETag"]
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, url
+        response = another_user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            "Убедитесь, что ETag страницы зависит от пользователя."
+        )
+
+    post_with_published_location.title = "Изменённый заголовок"
+    post_with_published_location.save()
+    for url in urls:
+        response = user_client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+        assert response.status_code == HTTPStatus.OK, url
+
+
+def test_feed_revalidates_after_newest_post_is_deleted(
+        client, mixer, user, published_category, PostModel
+):
+    older, newest = (
+        mixer.blend(
+            PostModel, author=user, category=published_category,
+            is_published=True, image="",
+            pub_date=timezone.now() - timezone.timedelta(days=days)
+        )
+        for days in (2, 1)
+    )
+    response = client.get("/")
+    assert not response.has_header("Last-Modified"), (
+        "Убедитесь, что лента не отдаёт Last-Modified: время последнего"
+        " изменения страницы может уменьшиться."
+    )
+    etag = response["ETag"]
+    newest.delete()
+
+    response = client.get(
+        "/",
+        HTTP_IF_NONE_MATCH=etag,
+        HTTP_IF_MODIFIED_SINCE=http_date(older.updated_at.timestamp() + 60),
+    )
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после удаления новейшей записи лента не отдаётся"
+        " с кодом 304."
+    )
+    response = client.get(
+        "/",
+        HTTP_IF_MODIFIED_SINCE=http_date(older.updated_at.timestamp() + 60),
+    )
+    assert response.status_code == HTTPStatus.OK
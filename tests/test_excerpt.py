@@ -0,0 +1,45 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = " ".join(f"слово{i}" for i in range(200))
+
+
+def test_excerpt_follows_text(post_with_published_location):
+    post = post_with_published_location
+    post.text = LONG_TEXT
+    post.save()
+    post.refresh_from_db(fields=["excerpt"])
+    assert post.excerpt == " ".join(LONG_TEXT.split()[:10]) + " …"
+
+    post.text = "Короткий текст"
+    post.save(update_fields=["text"])
+    post.refresh_from_db(fields=["excerpt"])
+    assert post.excerpt == "Короткий текст"
+
+
+def test_feed_does_not_load_text(client, post_with_published_location):
+    post = post_with_published_location
+    post.text = LONG_TEXT
+    post.save()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+    content = response.content.decode()
+    assert "слово9 …" in content and "слово10" not in content
+    post_table = post._meta.db_table
+    assert not any(
+        f'"{post_table}"."text"' in q["sql"] for q in queries
+    ), "Убедитесь, что в ленте не загружается полный текст записей."
+
+
+def test_fill_excerpts_command(PostModel, post_with_published_location):
+    post = post_with_published_location
+    PostModel.objects.filter(pk=post.pk).update(excerpt="")
+
+    call_command("fill_excerpts", batch_size=1)
+
+    post.refresh_from_db(fields=["excerpt"])
+    assert post.excerpt == PostModel.make_excerpt(post.text)
@@ -0,0 +1,80 @@
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite",
+        reason="План запроса проверяется только для SQLite.",
+    ),
+]
+
+
+@pytest.fixture
+def feed_request(user):
+    request = RequestFactory().get("/")
+    request.user = user
+    return request
+
+
+def _plan(queryset):
+    return queryset[:10].explain()
+
+
+def _assert_uses_index(plan, index_name):
+    assert f"USING INDEX {index_name}" in plan, (
+        f"Убедитесь, что запрос использует индекс `{index_name}`:\n{plan}"
+    )
+    assert "TEMP B-TREE" not in plan, (
+        f"Убедитесь, что сортировка выполняется по индексу:\n{plan}"
+    )
+
+
+def test_feed_uses_published_index(feed_request):
+    from blog.service import get_filtered_posts
+
+    _assert_uses_index(
+        _plan(get_filtered_posts(feed_request)),
+        "post_published_pub_date_idx",
+    )
+
+
+def test_category_feed_uses_category_index(feed_request, published_category):
+    from blog.service import get_filtered_posts
+
+    _assert_uses_index(
+        _plan(get_filtered_posts(feed_request).filter(
+            category=published_category
+        )),
+        "post_category_pub_date_idx",
+    )
+
+
+@pytest.mark.parametrize("all_posts", [False, True])
+def test_profile_uses_author_index(feed_request, user, all_posts):
+    from blog.service import get_filtered_posts
+
+    feed_request.user = user if all_posts else AnonymousUser()
+    _assert_uses_index(
+        _plan(get_filtered_posts(feed_request, all_posts=all_posts).filter(
+            author=user
+        )),
+        "post_author_pub_date_idx",
+    )
+
+
+def test_post_comments_use_post_index(CommentModel):
+    _assert_uses_index(
+        _plan(CommentModel.objects.filter(post_id=1)),
+        "comment_post_created_at_idx",
+    )
+
+
+def test_posts_by_category_use_category_index(PostModel, published_category):
+    plan = PostModel.objects.filter(category=published_category).explain()
+    assert "USING INDEX post_category_pub_date_idx" in plan, (
+        "Убедитесь, что все записи категории (без условия is_published)"
+        f" ищутся по индексу:\n{plan}"
+    )
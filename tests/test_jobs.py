@@ -0,0 +1,74 @@
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+CALLS = []
+
+
+@pytest.fixture
+def flaky_task():
+    from core.jobs import registry, task
+
+    @task("tests.flaky")
+    def flaky(fail):
+        CALLS.append(fail)
+        if fail:
+            raise RuntimeError("сбой")
+
+    CALLS.clear()
+    yield
+    registry.pop("tests.flaky")
+
+
+def test_worker_runs_and_retries_jobs(flaky_task):
+    from core.constants import JOB_MAX_ATTEMPTS
+    from core.jobs import enqueue
+    from core.models import Job
+
+    ok = enqueue("tests.flaky", fail=False)
+    broken = enqueue("tests.flaky", fail=True)
+
+    call_command("run_worker", "--once")
+
+    ok.refresh_from_db()
+    broken.refresh_from_db()
+    assert ok.status == Job.DONE
+    assert broken.status == Job.PENDING
+    assert broken.attempts == 1
+    assert broken.run_after > timezone.now()
+    assert "сбой" in broken.last_error
+
+    for _ in range(JOB_MAX_ATTEMPTS - 1):
+        Job.objects.filter(pk=broken.pk).update(run_after=timezone.now())
+        call_command("run_worker", "--once")
+    broken.refresh_from_db()
+    assert broken.status == Job.FAILED
+    assert CALLS.count(True) == JOB_MAX_ATTEMPTS
+
+
+def test_stale_jobs_are_requeued(flaky_task):
+    from datetime import timedelta
+
+    from core.jobs import enqueue
+    from core.models import Job
+
+    job = enqueue("tests.flaky", fail=False)
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.RUNNING,
+        started_at=timezone.now() - timedelta(hours=1)
+    )
+
+    call_command("run_worker", "--once", "--stale-after", "60")
+
+    job.refresh_from_db()
+    assert job.status == Job.DONE
+    assert CALLS == [False]
+
+
+def test_unknown_task_is_rejected():
+    from core.jobs import enqueue
+
+    with pytest.raises(ValueError):
+        enqueue("tests.missing")
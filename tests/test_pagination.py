@@ -0,0 +1,127 @@
+import base64
+import json
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _expected_ids(PostModel):
+    return list(
+        PostModel.objects.filter(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=timezone.now(),
+        ).order_by("-pub_date", "-id").values_list("id", flat=True)
+    )
+
+
+def test_keyset_pagination_walks_feed(
+        user_client, PostModel, many_posts_with_published_locations
+):
+    expected = _expected_ids(PostModel)
+    assert len(expected) > N_PER_PAGE
+
+    seen = []
+    pages = []
+    cursor = ""
+    while cursor is not None:
+        response = user_client.get("/", {"cursor": cursor})
+        assert response.status_code == 200
+        page_obj = response.context["page_obj"]
+        assert len(page_obj) <= N_PER_PAGE
+        seen.extend(post.id for post in page_obj)
+        pages.append(page_obj)
+        cursor = page_obj.next_cursor
+    assert seen == expected, (
+        "Убедитесь, что при постраничном выводе по курсору записи идут"
+        " «от новых к старым» без пропусков и повторов."
+    )
+
+    response = user_client.get("/", {"cursor": pages[-1].previous_cursor})
+    assert [post.id for post in response.context["page_obj"]] == [
+        post.id for post in pages[-2]
+    ]
+
+
+def _token(payload):
+    raw = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+BAD_CURSORS = [
+    "не-курсор",
+    _token(["n", [None, None]]),
+    _token(["n", [{}, {}]]),
+    _token(["n", ["2024-01-01T00:00:00+00:00", "2024-01-01T00:00:00+00:00"]]),
+    _token(["n", ["2024-01-01T00:00:00+00:00", True]]),
+    _token(["n", ["2024-01-01T00:00:00+00:00", 2 ** 80]]),
+    _token(["n", [1, 1]]),
+    _token(["n", ["2024-13-45T00:00:00+00:00", 1]]),
+    _token({"n": 1, "p": 2}),
+]
+
+
+@pytest.mark.parametrize("cursor", BAD_CURSORS)
+def test_keyset_pagination_bad_cursor(
+        user_client, PostModel, many_posts_with_published_locations, cursor
+):
+    response = user_client.get("/", {"cursor": cursor})
+    assert response.status_code == 200
+    assert [post.id for post in response.context["page_obj"]] == (
+        _expected_ids(PostModel)[:N_PER_PAGE]
+    )
+
+
+@pytest.mark.parametrize("cursor", BAD_CURSORS)
+def test_comment_pagination_bad_cursor(
+        client, post_with_published_location, cursor
+):
+    post = post_with_published_location
+    response = client.get(f"/posts/{post.id}/", {"comments": cursor})
+    assert response.status_code == 200
+
+
+def test_feed_count_is_cached(
+        user_client, mixer, user, published_category,
+        many_posts_with_published_locations
+):
+    user_client.get("/")
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get("/")
+    assert not any("COUNT(" in q["sql"] for q in queries), (
+        "Убедитесь, что число записей ленты берётся из кэша."
+    )
+    num_posts = response.context["page_obj"].paginator.count
+
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now()
+    )
+    response = user_client.get("/")
+    assert response.context["page_obj"].paginator.count == num_posts + 1
+
+
+@pytest.mark.parametrize("num_pages", [50, 50000])
+def test_paginator_renders_elided_range(num_pages):
+    from django.core.paginator import Paginator
+    from django.template.loader import render_to_string
+
+    from blog.service import get_elided_page_range
+
+    paginator = Paginator(range(num_pages * N_PER_PAGE), N_PER_PAGE)
+    page_obj = paginator.get_page(num_pages // 2)
+    page_obj.elided_page_range = get_elided_page_range(page_obj)
+    html = render_to_string(
+        "includes/paginator.html", {"page_obj": page_obj}
+    )
+    assert html.count("page-item") < 15, (
+        "Убедитесь, что навигация по страницам не выводит все номера"
+        " страниц подряд."
+    )
+    assert f"?page={num_pages}" in html
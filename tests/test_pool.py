@@ -0,0 +1,91 @@
+import sqlite3
+import threading
+
+import pytest
+from django.db import OperationalError
+
+from core.pool import ConnectionPool
+
+
+def _pool(tmp_path, **options):
+    return ConnectionPool(
+        lambda: sqlite3.connect(
+            tmp_path / "db.sqlite3", check_same_thread=False
+        ),
+        **options
+    )
+
+
+def test_pool_reuses_connections(tmp_path):
+    pool = _pool(tmp_path, max_size=2)
+    first, _ = pool.checkout()
+    pool.checkin(first)
+    again, waited = pool.checkout()
+    assert again is first
+    assert pool.stats().in_use == 1
+    assert pool.stats().size == 1
+
+
+def test_pool_waits_for_free_connection(tmp_path):
+    pool = _pool(tmp_path, max_size=1, timeout=5)
+    connection, _ = pool.checkout()
+    threading.Timer(0.05, pool.checkin, (connection,)).start()
+    again, waited = pool.checkout()
+    assert again is connection
+    assert waited >= 0.04
+    assert pool.stats().waits == 1
+
+    with pytest.raises(OperationalError):
+        _pool(tmp_path, max_size=0, timeout=0.01).checkout()
+
+
+def test_pool_replaces_broken_connections(tmp_path):
+    pool = _pool(tmp_path, max_size=1, check_after=0)
+    connection, _ = pool.checkout()
+    connection.close()
+    pool.checkin(connection)
+    fresh, _ = pool.checkout()
+    assert fresh is not connection
+    assert fresh.execute("SELECT 1").fetchone() == (1,)
+    assert pool.stats().size == 1
+
+
+def test_backend_returns_connections_to_pool(tmp_path, django_db_blocker):
+    from django.db.utils import ConnectionHandler
+
+    handler = ConnectionHandler({
+        "default": {
+            "ENGINE": "core.backends.sqlite3_pool",
+            "NAME": tmp_path / "pooled.sqlite3",
+            "POOL": {"MAX_SIZE": 2},
+        },
+    })
+    connection = handler["default"]
+    with django_db_blocker.unblock():
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        raw = connection.connection
+        connection.close()
+        assert connection.pool.stats().in_use == 0
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        assert connection.connection is raw
+        connection.close()
+
+
+def test_server_timing_header(tmp_path, rf, settings):
+    from django.http import HttpResponse
+
+    from core.middleware import PoolTimingMiddleware
+    from core.pool import get_pool, record_pool_wait
+
+    settings.POOL_TIMING_HEADERS = True
+    get_pool("timing", lambda: sqlite3.connect(":memory:"), max_size=4)
+
+    def view(request):
+        record_pool_wait(0.002)
+        return HttpResponse()
+
+    response = PoolTimingMiddleware(view)(rf.get("/"))
+    assert "pool-wait;dur=2.000" in response["Server-Timing"]
+    assert "pool-use;desc=" in response["Server-Timing"]
@@ -0,0 +1,118 @@
+import pytest
+from django.urls import get_resolver, reverse
+
+from core.queries import QueryCounter
+
+pytestmark = [pytest.mark.django_db]
+
+# Наибольшее число SQL-запросов на странице для авторизованного
+# пользователя, включая загрузку сессии и пользователя.
+QUERY_BUDGETS = {
+    "blog:index": 5,
+    "blog:post_detail": 6,
+    "blog:category_posts": 6,
+    "blog:profile": 6,
+    "blog:edit_profile": 2,
+    "blog:create_post": 4,
+    "blog:edit_post": 5,
+    "blog:delete_post": 6,
+    "blog:add_comment": 2,
+    "blog:edit_comment": 3,
+    "blog:delete_comment": 3,
+    "blog:search": 5,
+}
+
+
+@pytest.fixture
+def assert_query_budget():
+    """Проверяет число запросов к БД при GET-запросе и отсутствие N+1."""
+
+    def check(client, url, budget):
+        with QueryCounter() as counter:
+            response = client.get(url)
+        assert response.status_code == 200, url
+        assert not counter.repeated, (
+            f"Убедитесь, что страница {url} не выполняет одинаковые"
+            f" запросы в цикле (N+1): {list(counter.repeated)}"
+        )
+        assert counter.count <= budget, (
+            f"Страница {url} выполнила {counter.count} SQL-запросов"
+            f" при бюджете {budget}."
+        )
+        return response
+
+    return check
+
+
+def test_every_blog_url_has_budget():
+    names = {
+        f"blog:{name}" for name in get_resolver("blog.urls").reverse_dict
+        if isinstance(name, str)
+    }
+    assert names == set(QUERY_BUDGETS), (
+        "Укажите бюджет запросов для каждого адреса из blog.urls."
+    )
+
+
+@pytest.fixture
+def blog_urls(mixer, user, another_user, CommentModel,
+              many_posts_with_published_locations):
+    post = many_posts_with_published_locations[0]
+    for other in many_posts_with_published_locations:
+        mixer.cycle(3).blend(CommentModel, post=other, author=another_user)
+    comment = mixer.blend(CommentModel, post=post, author=user)
+    return {
+        "blog:index": reverse("blog:index"),
+        "blog:post_detail": reverse("blog:post_detail", args=(post.id,)),
+        "blog:category_posts": reverse(
+            "blog:category_posts", args=(post.category.slug,)
+        ),
+        "blog:profile": reverse("blog:profile", args=(user.username,)),
+        "blog:edit_profile": reverse("blog:edit_profile"),
+        "blog:create_post": reverse("blog:create_post"),
+        "blog:edit_post": reverse("blog:edit_post", args=(post.id,)),
+        "blog:delete_post": reverse("blog:delete_post", args=(post.id,)),
+        "blog:add_comment": reverse("blog:add_comment", args=(post.id,)),
+        "blog:edit_comment": reverse(
+            "blog:edit_comment", args=(post.id, comment.id)
+        ),
+        "blog:delete_comment": reverse(
+            "blog:delete_comment", args=(post.id, comment.id)
+        ),
+        "blog:search": reverse("blog:search") + "?q=" + post.title.split()[0],
+    }
+
+
+@pytest.mark.parametrize("name", sorted(QUERY_BUDGETS))
+def test_query_budget(user_client, assert_query_budget, blog_urls, name):
+    assert_query_budget(user_client, blog_urls[name], QUERY_BUDGETS[name])
+
+
+def test_query_counter_flags_n_plus_one(
+        PostModel, many_posts_with_published_locations
+):
+    with QueryCounter() as counter:
+        for post in PostModel.objects.all()[:5]:
+            post.author.username
+    assert len(counter.repeated) == 1
+
+    with QueryCounter() as counter:
+        for post in PostModel.objects.select_related("author")[:5]:
+            post.author.username
+    assert counter.count == 1 and not counter.repeated
+
+
+def test_middleware_reports_queries(settings, user_client):
+    settings.QUERY_GUARD_HEADERS = True
+    response = user_client.get("/")
+    assert int(response["X-Query-Count"]) > 0
+    assert not response.has_header("X-N-Plus-One")
+
+
+def test_middleware_is_off_without_query_guard(settings, client):
+    settings.QUERY_GUARD = False
+    settings.QUERY_GUARD_HEADERS = True
+    response = client.get("/")
+    assert not response.has_header("X-Query-Count"), (
+        "Убедитесь, что без QUERY_GUARD запросы не подсчитываются."
+    )
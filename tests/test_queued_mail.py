@@ -0,0 +1,71 @@
+from email.header import decode_header, make_header
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+LOCMEM = "django.core.mail.backends.locmem.EmailBackend"
+
+
+@pytest.fixture
+def queued_mail(settings):
+    settings.EMAIL_BACKEND = "core.mail.QueuedEmailBackend"
+    settings.QUEUED_EMAIL_BACKEND = LOCMEM
+
+
+def test_mail_is_queued_and_flushed(queued_mail):
+    from core.models import QueuedEmail
+
+    mail.send_mail(
+        "Тема", "Текст письма", "from@example.com", ["to@example.com"]
+    )
+    assert mail.outbox == []
+    assert QueuedEmail.objects.get().status == QueuedEmail.PENDING
+
+    call_command("send_queued_mail", "--once")
+
+    assert len(mail.outbox) == 1
+    message = mail.outbox[0].message()
+    assert str(make_header(decode_header(message["Subject"]))) == "Тема"
+    assert message["To"] == "to@example.com"
+    assert "Текст письма" in message.get_payload(decode=True).decode()
+    assert QueuedEmail.objects.get().status == QueuedEmail.SENT
+
+
+def test_password_reset_does_not_send_inline(
+        queued_mail, client, django_user_model
+):
+    from core.models import QueuedEmail
+
+    django_user_model.objects.create_user(
+        "reader", "reader@example.com", "password"
+    )
+    response = client.post(
+        "/auth/password_reset/", {"email": "reader@example.com"}
+    )
+    assert response.status_code == 302
+    assert mail.outbox == []
+    assert QueuedEmail.objects.get().recipients == ["reader@example.com"]
+
+
+def test_failed_mail_is_retried(queued_mail, monkeypatch):
+    from django.core.mail.backends.locmem import EmailBackend
+
+    from core.constants import EMAIL_MAX_ATTEMPTS
+    from core.models import QueuedEmail
+
+    def refuse(self, messages):
+        raise ConnectionRefusedError("сервер недоступен")
+
+    monkeypatch.setattr(EmailBackend, "send_messages", refuse)
+    mail.send_mail("Тема", "Текст", "from@example.com", ["to@example.com"])
+
+    for attempt in range(1, EMAIL_MAX_ATTEMPTS + 1):
+        call_command("send_queued_mail", "--once")
+        email = QueuedEmail.objects.get()
+        assert email.attempts == attempt
+        assert "сервер недоступен" in email.last_error
+        QueuedEmail.objects.update(send_after=email.created_at)
+    assert email.status == QueuedEmail.FAILED
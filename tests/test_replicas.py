@@ -0,0 +1,74 @@
+import sqlite3
+
+import pytest
+from django.core.management import call_command
+from django.http import HttpResponse
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ["replica"]
+
+
+def test_router_reads_from_replica_until_write(replicas):
+    from blog.models import Post
+    from core.replicas import ReplicaRouter, replica_reads
+
+    router = ReplicaRouter()
+    assert router.db_for_read(Post) == "default", (
+        "Вне HTTP-запроса чтение должно идти с основной базы."
+    )
+    with replica_reads() as state:
+        assert router.db_for_read(Post) == "replica"
+        assert router.db_for_write(Post) == "default"
+        assert state.wrote
+        assert router.db_for_read(Post) == "default"
+    assert router.allow_migrate("replica", "blog") is False
+
+
+def test_middleware_pins_reads_after_write(replicas, rf):
+    from blog.models import Post
+    from core.constants import REPLICA_PIN_COOKIE
+    from core.middleware import ReplicaPinningMiddleware
+    from core.replicas import ReplicaRouter
+
+    router = ReplicaRouter()
+    used = []
+
+    def view(request):
+        used.append(router.db_for_read(Post))
+        if request.method == "POST":
+            router.db_for_write(Post)
+        return HttpResponse()
+
+    middleware = ReplicaPinningMiddleware(view)
+    response = middleware(rf.get("/"))
+    assert REPLICA_PIN_COOKIE not in response.cookies
+
+    response = middleware(rf.post("/"))
+    assert response.cookies[REPLICA_PIN_COOKIE]["max-age"]
+
+    request = rf.get("/")
+    request.COOKIES[REPLICA_PIN_COOKIE] = "1"
+    middleware(request)
+    assert used == ["replica", "default", "default"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_replicas_copies_database(settings, tmp_path, user):
+    replica = tmp_path / "replica.sqlite3"
+    settings.DATABASES = {
+        **settings.DATABASES,
+        "replica": {
+            "ENGINE": "django.db.backends.sqlite3", "NAME": replica
+        },
+    }
+    settings.DATABASE_REPLICAS = ["replica"]
+
+    call_command("sync_replicas")
+
+    with sqlite3.connect(replica) as connection:
+        usernames = connection.execute(
+            "SELECT username FROM auth_user"
+        ).fetchall()
+    assert usernames == [(user.username,)]
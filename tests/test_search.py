@@ -0,0 +1,164 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(title, text, **kwargs):
+        fields = dict(
+            author=user, category=published_category, is_published=True,
+            pub_date=timezone.now(), image="",
+        )
+        fields.update(kwargs)
+        return mixer.blend("blog.Post", title=title, text=text, **fields)
+    return make
+
+
+def _search(client, query, **params):
+    response = client.get("/search/", {"q": query, **params})
+    assert response.status_code == 200
+    page_obj = response.context["page_obj"]
+    return [post.id for post in page_obj], response
+
+
+def _index_size():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM blog_post_search")
+        return cursor.fetchone()[0]
+
+
+def test_search_ranks_and_highlights(client, make_post, mixer, user):
+    in_text = make_post("Заметки", "Готовим <b>рецепты</b> пирогов")
+    in_title = make_post("Рецепт пирога", "Тесто и начинка")
+    in_comment = make_post("Прогулка", "Парк и пруд")
+    mixer.blend(
+        "blog.Comment", post=in_comment, author=user,
+        text="Дайте рецепт!", is_published=True
+    )
+    make_post("Другое", "Ничего общего")
+
+    found, response = _search(client, "рецепт")
+    assert found == [in_title.id, in_text.id, in_comment.id], (
+        "Убедитесь, что совпадения в заголовке ранжируются выше, чем"
+        " в тексте и комментариях."
+    )
+    content = response.content.decode()
+    assert "<mark>Рецепт</mark> пирога" in content
+    assert "&lt;b&gt;<mark>рецепты</mark>&lt;/b&gt;" in content, (
+        "Убедитесь, что фрагменты текста экранируются."
+    )
+
+
+def test_search_respects_visibility(client, make_post, mixer, user):
+    visible = make_post("Закат", "Море")
+    make_post("Закат", "Черновик", is_published=False)
+    make_post(
+        "Закат", "Потом", pub_date=timezone.now() + timezone.timedelta(1)
+    )
+    hidden = make_post("Рассвет", "Горы")
+    mixer.blend(
+        "blog.Comment", post=hidden, author=user, text="закат",
+        is_published=False
+    )
+    found, _ = _search(client, "закат")
+    assert found == [visible.id]
+
+
+def test_index_follows_changes(
+        client, make_post, mixer, user, CommentModel
+):
+    post = make_post("Облака", "Кучевые")
+    comment = mixer.blend(
+        "blog.Comment", post=post, author=user, text="перистые"
+    )
+    assert _search(client, "перистые")[0] == [post.id]
+
+    CommentModel.objects.filter(pk=comment.pk).update(is_published=False)
+    assert _search(client, "перистые")[0] == []
+
+    post.text = "Слоистые"
+    post.save()
+    assert _search(client, "кучевые")[0] == []
+    assert _search(client, "слоистые")[0] == [post.id]
+
+    size = _index_size()
+    post.delete()
+    assert _index_size() == size - 1
+
+
+def test_rebuild_command(client, make_post, PostModel):
+    post = make_post("Ветер", "Северный")
+    PostModel.objects.filter(pk=post.pk).update(text="Южный")
+    assert _search(client, "южный")[0] == []
+
+    call_command("rebuild_search_index")
+    assert _search(client, "южный")[0] == [post.id]
+
+
+def test_like_backend_and_pagination(client, make_post, settings):
+    settings.BLOG_SEARCH_BACKEND = "blog.search.LikeSearchBackend"
+    posts = [make_post(f"звезда {i}", "Небо") for i in range(12)]
+    found, response = _search(client, "звезда")
+    assert len(found) == 10 and set(found) <= {post.id for post in posts}
+    assert "?q=%D0%B7%D0%B2%D0%B5%D0%B7%D0%B4%D0%B0&amp;page=2" in (
+        response.content.decode()
+    ), "Убедитесь, что ссылки на страницы выдачи сохраняют запрос."
+    assert len(_search(client, "звезда", page=2)[0]) == 2
+
+
+def test_admin_search_uses_index(
+        admin_client, make_post, user, CommentModel
+):
+    lighthouse = make_post("Маяк", "Берег")
+    stormy = make_post("Шторм", "Волны")
+    CommentModel.objects.bulk_create([
+        CommentModel(post=stormy, author=user, text="Видно маяк"),
+        CommentModel(post=stormy, author=user, text="Ничего не видно"),
+    ])
+
+    def admin_search(model, query):
+        with CaptureQueriesContext(connection) as queries:
+            response = admin_client.get(f"/admin/blog/{model}/", {"q": query})
+        assert not any(" LIKE " in q["sql"] for q in queries), (
+            "Убедитесь, что поиск в админке использует полнотекстовый"
+            " индекс."
+        )
+        return [obj.pk for obj in response.context["cl"].result_list]
+
+    assert admin_search("post", "маяк") == [lighthouse.id]
+    assert len(admin_search("comment", "маяк")) == 1
+
+    CommentModel.objects.filter(post=stormy).update(text="Штиль")
+    assert admin_search("comment", "маяк") == []
+    assert len(admin_search("comment", "штиль")) == 2
+
+
+def test_comment_changes_skip_post_index(
+        client, make_post, mixer, user, CommentModel
+):
+    post = make_post("Озеро", "Тихое")
+    with CaptureQueriesContext(connection) as queries:
+        comment = mixer.blend(
+            CommentModel, post=post, author=user, text="Кувшинки у берега"
+        )
+        comment.text = "Камыши у берега"
+        comment.save()
+        comment.delete()
+        CommentModel.objects.bulk_create([
+            CommentModel(post=post, author=user, text="Кувшинки и камыши"),
+        ])
+    assert not any("blog_post_search" in q["sql"] for q in queries), (
+        "Убедитесь, что изменение комментария не переиндексирует запись."
+    )
+
+    found, response = _search(client, "кувшинки")
+    assert found == [post.id]
+    assert "<mark>Кувшинки</mark> и камыши" in response.content.decode(), (
+        "Убедитесь, что для совпадения в комментарии выводится фрагмент"
+        " комментария."
+    )
@@ -0,0 +1,32 @@
+import sqlite3
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+
+from core.sqlite import apply_pragmas, get_pragmas
+
+
+@pytest.mark.django_db
+def test_connection_is_tuned():
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA synchronous")
+        assert cursor.fetchone() == (1,), (
+            "Убедитесь, что соединения SQLite открываются с"
+            " synchronous=NORMAL."
+        )
+        cursor.execute("PRAGMA busy_timeout")
+        assert cursor.fetchone() == (get_pragmas()["busy_timeout"],)
+
+
+def test_file_database_uses_wal(tmp_path):
+    db = sqlite3.connect(tmp_path / "db.sqlite3")
+    apply_pragmas(db, get_pragmas())
+    assert db.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    db.close()
+
+
+def test_bad_pragma_is_rejected():
+    db = sqlite3.connect(":memory:")
+    with pytest.raises(ImproperlyConfigured):
+        apply_pragmas(db, {"journal_mode": "WAL; DROP TABLE auth_user"})
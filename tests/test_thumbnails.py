@@ -0,0 +1,203 @@
+from io import BytesIO
+
+import pytest
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+    settings.JOBS_EAGER = True
+    cache.clear()
+    return tmp_path
+
+
+def _upload(name="photo.jpg", size=(2000, 1000), exif=None):
+    buffer = BytesIO()
+    Image.new("RGB", size, "teal").save(buffer, "JPEG", exif=exif or b"")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+def test_renditions_are_made_on_upload(
+        media_root, mixer, user, published_category
+):
+    from blog.thumbnails import FALLBACK, WEBP, get_renditions
+
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=_upload()
+    )
+    files = sorted(
+        path.name for path in (media_root / "thumbnails").rglob("*.*")
+        if path.suffix != ".json"
+    )
+    assert len(files) == 4
+    renditions = get_renditions(post.image)
+    assert [r.width for r in renditions[WEBP]] == [640, 1280]
+    assert [r.height for r in renditions[FALLBACK]] == [320, 640]
+    assert renditions[WEBP][0].content_type == "image/webp"
+
+    other = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=_upload("copy.jpg")
+    )
+    assert get_renditions(other.image) == renditions, (
+        "Убедитесь, что копии одинаковых изображений не создаются заново."
+    )
+
+
+def test_post_card_uses_renditions(
+        media_root, client, mixer, user, published_category
+):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=_upload(size=(300, 200))
+    )
+    content = client.get("/").content.decode()
+    assert 'type="image/webp"' in content
+    assert "-300x200.webp 300w" in content
+    assert content.count("-300x200.webp") == 1, (
+        "Убедитесь, что для маленького оригинала не создаются копии"
+        " одинакового размера."
+    )
+    assert content.count("img-thumbnail") == 1
+
+
+def test_broken_image_falls_back_to_original(
+        media_root, mixer, user, published_category
+):
+    from blog.templatetags.thumbnails import thumbnail_srcset, thumbnail_url
+
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=SimpleUploadedFile("broken.jpg", b"not an image")
+    )
+    assert thumbnail_url(post.image, "card") == post.image.url
+    assert thumbnail_srcset(post.image) == ""
+
+
+def test_image_is_processed_by_worker(
+        media_root, settings, client, mixer, user, published_category
+):
+    from core.models import Job
+
+    settings.JOBS_EAGER = False
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: повернуть на 90° по часовой стрелке
+    exif[0x010F] = "Camera"
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=_upload(size=(400, 200), exif=exif.tobytes())
+    )
+    original = post.image.name
+    assert Job.objects.filter(
+        name="blog.process_post_image", status=Job.PENDING
+    ).count() == 1
+    content = client.get("/").content.decode()
+    assert f'src="{post.image.url}"' in content
+    assert 'type="image/webp"' not in content
+
+    call_command("run_worker", "--once")
+
+    assert Job.objects.get().status == Job.DONE
+    post.refresh_from_db()
+    assert post.image.name != original
+    assert not (media_root / original).exists()
+    with Image.open(post.image.path) as image:
+        assert image.size == (200, 400)
+        assert not image.getexif()
+    cache.clear()
+    content = client.get("/").content.decode()
+    assert "-200x400.webp 200w" in content
+
+
+def test_missing_manifest_is_cached(
+        media_root, settings, monkeypatch, mixer, user, published_category
+):
+    from blog.templatetags.thumbnails import thumbnail_url
+
+    settings.JOBS_EAGER = False
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=_upload()
+    )
+    storage = post.image.storage
+    opened = []
+    original_open = storage.open
+    monkeypatch.setattr(
+        storage, "open",
+        lambda name, *args: opened.append(name) or original_open(name, *args)
+    )
+    for _ in range(3):
+        assert thumbnail_url(post.image, "card") == post.image.url
+    monkeypatch.undo()
+    assert len(opened) == 1, (
+        "Убедитесь, что отсутствие копий запоминается в кэше."
+    )
+
+    call_command("run_worker", "--once")
+    post.refresh_from_db()
+    assert thumbnail_url(post.image, "card").endswith("-640x320.jpg"), (
+        "Убедитесь, что обработка изображения заменяет отметку в кэше."
+    )
+
+
+def test_enqueue_post_images_command(
+        media_root, settings, mixer, user, published_category, PostModel
+):
+    from core.models import Job
+
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=_upload()
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=published_category, image=""
+    )
+    settings.JOBS_EAGER = False
+    post = PostModel.objects.create(
+        title="Без копий", text="Текст", pub_date=timezone.now(),
+        author=user, category=published_category, image=_upload("old.jpg")
+    )
+    Job.objects.all().delete()
+
+    call_command("enqueue_post_images", "--dry-run")
+    assert not Job.objects.exists()
+
+    call_command("enqueue_post_images")
+    assert list(Job.objects.values_list("payload", flat=True)) == [{
+        "post_id": post.pk, "name": post.image.name, "force": False
+    }], "Убедитесь, что в очередь ставятся только изображения без копий."
+
+    call_command("enqueue_post_images", "--all")
+    assert Job.objects.count() == 3, (
+        "Убедитесь, что с --all в очередь ставятся все изображения."
+    )
+
+
+def test_enqueue_all_rebuilds_renditions_for_new_sizes(
+        media_root, monkeypatch, mixer, user, published_category
+):
+    from blog import thumbnails
+
+    post = mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        image=_upload()
+    )
+    renditions = thumbnails.get_renditions(post.image)
+    assert [r.width for r in renditions[thumbnails.WEBP]] == [640, 1280]
+
+    monkeypatch.setitem(thumbnails.THUMBNAIL_SIZES, "card", 480)
+    call_command("enqueue_post_images", "--all")
+
+    renditions = thumbnails.get_renditions(post.image, generate=False)
+    assert [r.width for r in renditions[thumbnails.WEBP]] == [480, 1280], (
+        "Убедитесь, что с --all копии создаются заново по новым размерам."
+    )
+    assert renditions[thumbnails.WEBP][0].url.endswith("-480x240.webp")